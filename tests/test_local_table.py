@@ -0,0 +1,62 @@
+import asyncio
+from pathlib import Path
+
+from youwol_utils.clients.docdb.local_docdb import LocalDocDbClient
+from youwol_utils.clients.docdb.local_table import LocalTableStore
+from youwol_utils.clients.docdb.models import TableBody, Column
+
+table_body = TableBody(name="t", version="0.0", columns=[Column(name="id", type="text")], partition_key=["id"],
+                       clustering_columns=[])
+
+
+async def create_client(root_path: Path) -> LocalDocDbClient:
+
+    doc_db = LocalDocDbClient(root_path=root_path, keyspace_name="ks", table_body=table_body, version_table="0.0")
+    await doc_db.ensure_table()
+    await doc_db.update_document({"id": "a"}, owner="/o")
+    return doc_db
+
+
+def ids_in_memory(doc_db: LocalDocDbClient):
+    return sorted(doc["id"] for doc in doc_db.store.table.all_documents())
+
+
+def ids_on_disk(doc_db: LocalDocDbClient):
+    store = LocalTableStore(base_path=doc_db.base_path, table_body=table_body, secondary_indexes=[])
+    return sorted(doc["id"] for doc in store.table.all_documents())
+
+
+def test_write_concurrent_with_compact(tmp_path: Path):
+
+    async def run():
+        doc_db = await create_client(tmp_path)
+        await asyncio.gather(doc_db.store.compact(), doc_db.update_document({"id": "b"}, owner="/o"))
+        return doc_db
+
+    doc_db = asyncio.run(run())
+    assert ids_in_memory(doc_db) == ["a", "b"]
+    assert ids_on_disk(doc_db) == ["a", "b"]
+
+
+def test_write_concurrent_with_clear(tmp_path: Path):
+
+    async def run():
+        doc_db = await create_client(tmp_path)
+        await asyncio.gather(doc_db.clear_data(), doc_db.update_document({"id": "b"}, owner="/o"))
+        return doc_db
+
+    doc_db = asyncio.run(run())
+    assert ids_in_memory(doc_db) == ["b"]
+    assert ids_on_disk(doc_db) == ["b"]
+
+
+def test_write_superseded_by_clear(tmp_path: Path):
+
+    async def run():
+        doc_db = await create_client(tmp_path)
+        await asyncio.gather(doc_db.update_document({"id": "b"}, owner="/o"), doc_db.clear_data())
+        return doc_db
+
+    doc_db = asyncio.run(run())
+    assert ids_in_memory(doc_db) == []
+    assert ids_on_disk(doc_db) == []
@@ -37,6 +37,7 @@ from youwol_infra.dynamic_configuration import dynamic_config
 from youwol_infra.service_configuration import configuration, assert_python
 from youwol_infra.web_sockets import WebSocketsStore, start_web_socket
 from youwol_utils import YouWolException, log_error
+from youwol_utils.clients.http_sessions import HttpSessions
 
 
 app = FastAPI(
@@ -101,6 +102,16 @@ async def youwol_exception_handler(request: Request, exc: YouWolException):
         )
 
 
+@app.on_event("startup")
+async def startup():
+    await HttpSessions.startup()
+
+
+@app.on_event("shutdown")
+async def shutdown():
+    await HttpSessions.shutdown()
+
+
 @app.get(configuration.base_path + "/healthz")
 async def healthz():
     return {"status": "youwol-infra ok"}
@@ -2,7 +2,7 @@ import asyncio
 import glob
 from dataclasses import dataclass, field
 from pathlib import Path
-from typing import List, Mapping, Any
+from typing import List, Mapping
 
 from aiohttp import ClientSession
 from fastapi import APIRouter, WebSocket, Depends
@@ -16,9 +16,12 @@ from youwol_infra.dynamic_configuration import dynamic_config, DynamicConfigurat
 from youwol_infra.routers.common import StatusBase, Sanity, HelmValues, install_pack, upgrade_pack
 from youwol_infra.service_configuration import Configuration
 from youwol_infra.utils.k8s_utils import k8s_port_forward
-from youwol_infra.utils.utils import to_json_response, get_port_number, get_aiohttp_session, parse_json
+from youwol_infra.utils.utils import to_json_response, get_port_number, get_aiohttp_session
 from youwol_infra.web_sockets import WebSocketsStore, start_web_socket
-from youwol_utils import raise_exception_from_response, QueryBody
+from youwol_utils import raise_exception_from_response, QueryBody, log_error
+from youwol_utils.clients.docdb.bulk import run_bulk
+from youwol_utils.clients.docdb.local_docdb_sqlite import read_sqlite_documents
+from youwol_utils.clients.docdb.local_table import read_local_documents
 
 router = APIRouter()
 
@@ -280,8 +283,12 @@ class LocalTablesResponse(BaseModel):
 async def local_tables(
         body: LocalTablesBody
         ):
-    paths_data = glob.glob(f'{body.folder}/**/data.json', recursive=True)
-    tables = [LocalTable(keyspace=path.split('/')[-3], name=path.split('/')[-2]) for path in paths_data]
+    # a table can have only its operations log ('data.log') if it has not been compacted yet, or be stored
+    # by LocalDocDbSqliteClient ('data.sqlite')
+    paths_data = [path for name in ['data.json', 'data.log', 'data.sqlite']
+                  for path in glob.glob(f'{body.folder}/**/{name}', recursive=True)]
+    folders = list(dict.fromkeys(tuple(path.split('/')[-3:-1]) for path in paths_data))
+    tables = [LocalTable(keyspace=keyspace, name=name) for keyspace, name in folders]
     return LocalTablesResponse(tables=tables)
 
 
@@ -291,12 +298,6 @@ class SyncLocalTableBody(BaseModel):
     tables: List[LocalTable]
 
 
-def chunk(from_list: List[Any], chunk_size: int) -> List[List[Any]]:
-    n = chunk_size
-    final = [from_list[i * n:(i + 1) * n] for i in range((len(from_list) + n - 1) // n)]
-    return final
-
-
 @router.post("/{namespace}/sync-local-tables", summary="synchronize a provided list of local tables")
 async def sync_local_tables(
         request: Request,
@@ -315,7 +316,10 @@ async def sync_local_tables(
                  if p.name == DocDb.name and p.namespace == namespace)
 
     def get_documents(folder_path: Path):
-        return parse_json(folder_path / 'data.json')['documents']
+        # once created, 'data.sqlite' supersedes the files it has been imported from
+        if (folder_path / "data.sqlite").exists():
+            return read_sqlite_documents(folder_path / "data.sqlite")
+        return read_local_documents(folder_path)
 
     async def export_document(http_session: ClientSession, keyspace: str, table: str, document: Mapping[str, any]):
         url = f"http://127.0.0.1:{docdb.docdb_port_fwd}/api/v0-alpha1/{keyspace}/{table}/document"
@@ -347,19 +351,35 @@ async def sync_local_tables(
                          for table in {t.name for t in body.tables if t.keyspace == keyspace}
                          for doc in get_documents(Path(body.folder) / keyspace / table)
                          ]
-        batches = chunk(all_documents, 5)
-        async with get_aiohttp_session() as session:
-            for index, batch in enumerate(batches):
-                await asyncio.gather(
-                    ctx.info(text=f'scylla => proceed batch {index}/{len(batches)}', json=batch),
-                    channel_ws.send_json({
-                        "topic": "Docdb.SyncLocalData",
-                        "operationId": body.operationId,
-                        "package": {"name": docdb.name, "namespace": docdb.namespace},
-                        "progress": index/len(batches)
-                        }),
-                    *[export_document(session, keyspace, table, doc) for keyspace, table, doc in batch]
-                    )
+        exported = 0
+
+        async def send_progress(progress: float):
+            # best effort: a failed notification is not a failed export
+            try:
+                await channel_ws.send_json({
+                    "topic": "Docdb.SyncLocalData",
+                    "operationId": body.operationId,
+                    "package": {"name": docdb.name, "namespace": docdb.namespace},
+                    "progress": progress
+                    })
+            except Exception as e:
+                log_error("Failed to send the progress of the export", str(e))
+
+        async def export(session: ClientSession, item):
+            nonlocal exported
+            keyspace, table, document = item
+            await export_document(session, keyspace, table, document)
+            exported += 1
+            if exported % 100 == 0:
+                await send_progress(exported / len(all_documents))
+
+        await ctx.info(text=f'scylla => export {len(all_documents)} documents')
+        async with get_aiohttp_session() as http_session:
+            result = await run_bulk(all_documents, lambda item: export(http_session, item), concurrency=20)
+        if result["errors"]:
+            await ctx.error(text=f'scylla => {len(result["errors"])} documents failed to be exported',
+                            json={"errors": [{**error, "document": all_documents[error["index"]]}
+                                             for error in result["errors"]]})
         await channel_ws.send_json({
             "topic": "Docdb.SyncLocalData",
             "operationId": body.operationId,
@@ -4,4 +4,5 @@ from .cdn import *
 from .docdb import *
 from .storage import *
 from .utils import *
+from .http_sessions import *
 from .types import *
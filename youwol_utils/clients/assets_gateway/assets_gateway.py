@@ -1,7 +1,7 @@
 from typing import Dict, Any
-import aiohttp
 from dataclasses import dataclass, field
 
+from youwol_utils.clients.http_sessions import pooled_session
 from youwol_utils.clients.utils import raise_exception_from_response
 
 
@@ -12,15 +12,9 @@ class AssetsGatewayClient:
 
     headers: Dict[str, str] = field(default_factory=lambda: {})
 
-    @staticmethod
-    def get_aiohttp_connector():
-        return aiohttp.TCPConnector(verify_ssl=False)
-
     async def healthz(self, **kwargs):
         url = f"{self.url_base}/healthz"
-        async with aiohttp.ClientSession(
-                connector=self.get_aiohttp_connector(),
-                headers=self.headers) as session:
+        async with pooled_session(self.url_base, self.headers, verify_ssl=False) as session:
             async with await session.get(url=url, **kwargs) as resp:
                 if resp.status == 200:
                     return await resp.json()
@@ -31,7 +25,7 @@ class AssetsGatewayClient:
         # data = files = {'file': open(zip_path, 'rb')}
         url = f"{self.url_base}/assets/{kind}/location/{folder_id}"
         params = {"group-id": group_id} if group_id else {}
-        async with aiohttp.ClientSession(connector=self.get_aiohttp_connector(), headers=self.headers) as session:
+        async with pooled_session(self.url_base, self.headers, verify_ssl=False) as session:
             async with await session.put(url=url, data=data, params=params, **kwargs) as resp:
                 if resp.status == 200:
                     return await resp.json()
@@ -42,7 +36,7 @@ class AssetsGatewayClient:
         url = f"{self.url_base}/raw/{kind}/metadata/{raw_id}"
         url = url if not rest_of_path else f"{url}/{rest_of_path}"
 
-        async with aiohttp.ClientSession(connector=self.get_aiohttp_connector(), headers=self.headers) as session:
+        async with pooled_session(self.url_base, self.headers, verify_ssl=False) as session:
             async with await session.get(url=url,  **kwargs) as resp:
                 if resp.status == 200:
                     return await resp.json()
@@ -52,7 +46,7 @@ class AssetsGatewayClient:
 
         url = f"{self.url_base}/tree/items/{item_id}"
 
-        async with aiohttp.ClientSession(connector=self.get_aiohttp_connector(), headers=self.headers) as session:
+        async with pooled_session(self.url_base, self.headers, verify_ssl=False) as session:
             async with await session.get(url=url, **kwargs) as resp:
                 if resp.status == 200:
                     return await resp.json()
@@ -62,7 +56,7 @@ class AssetsGatewayClient:
 
         url = f"{self.url_base}/tree/folders/{folder_id}"
 
-        async with aiohttp.ClientSession(connector=self.get_aiohttp_connector(), headers=self.headers) as session:
+        async with pooled_session(self.url_base, self.headers, verify_ssl=False) as session:
             async with await session.get(url=url, **kwargs) as resp:
                 if resp.status == 200:
                     return await resp.json()
@@ -72,7 +66,7 @@ class AssetsGatewayClient:
 
         url = f"{self.url_base}/tree/folders/{parent_folder_id}"
 
-        async with aiohttp.ClientSession(connector=self.get_aiohttp_connector(), headers=self.headers) as session:
+        async with pooled_session(self.url_base, self.headers, verify_ssl=False) as session:
             async with await session.put(url=url, json=body, **kwargs) as resp:
                 if resp.status == 200:
                     return await resp.json()
@@ -82,7 +76,7 @@ class AssetsGatewayClient:
 
         url = f"{self.url_base}/tree/drives/{drive_id}"
 
-        async with aiohttp.ClientSession(connector=self.get_aiohttp_connector(), headers=self.headers) as session:
+        async with pooled_session(self.url_base, self.headers, verify_ssl=False) as session:
             async with await session.get(url=url, **kwargs) as resp:
                 if resp.status == 200:
                     return await resp.json()
@@ -91,7 +85,7 @@ class AssetsGatewayClient:
     async def create_drive(self, group_id: str, body, **kwargs):
 
         url = f"{self.url_base}/tree/groups/{group_id}/drives"
-        async with aiohttp.ClientSession(connector=self.get_aiohttp_connector(), headers=self.headers) as session:
+        async with pooled_session(self.url_base, self.headers, verify_ssl=False) as session:
             async with await session.put(url=url, json=body, **kwargs) as resp:
                 if resp.status == 200:
                     return await resp.json()
@@ -101,7 +95,7 @@ class AssetsGatewayClient:
 
         url = f"{self.url_base}/groups"
 
-        async with aiohttp.ClientSession(connector=self.get_aiohttp_connector(), headers=self.headers) as session:
+        async with pooled_session(self.url_base, self.headers, verify_ssl=False) as session:
             async with await session.get(url=url,  **kwargs) as resp:
                 if resp.status == 200:
                     return await resp.json()
@@ -111,7 +105,7 @@ class AssetsGatewayClient:
 
         url = f"{self.url_base}/tree/groups/{group_id}/drives"
 
-        async with aiohttp.ClientSession(connector=self.get_aiohttp_connector(), headers=self.headers) as session:
+        async with pooled_session(self.url_base, self.headers, verify_ssl=False) as session:
             async with await session.get(url=url,  **kwargs) as resp:
                 if resp.status == 200:
                     return await resp.json()
@@ -121,7 +115,7 @@ class AssetsGatewayClient:
 
         url = f"{self.url_base}/assets/{asset_id}"
 
-        async with aiohttp.ClientSession(connector=self.get_aiohttp_connector(), headers=self.headers) as session:
+        async with pooled_session(self.url_base, self.headers, verify_ssl=False) as session:
             async with await session.get(url=url,  **kwargs) as resp:
                 if resp.status == 200:
                     return await resp.json()
@@ -131,7 +125,7 @@ class AssetsGatewayClient:
 
         url = f"{self.url_base}/assets/{asset_id}"
 
-        async with aiohttp.ClientSession(connector=self.get_aiohttp_connector(), headers=self.headers) as session:
+        async with pooled_session(self.url_base, self.headers, verify_ssl=False) as session:
             async with await session.post(url=url, json=body, **kwargs) as resp:
                 if resp.status == 200:
                     return await resp.json()
@@ -141,7 +135,7 @@ class AssetsGatewayClient:
 
         url = f"{self.url_base}/assets/{asset_id}/images/{filename}"
 
-        async with aiohttp.ClientSession(connector=self.get_aiohttp_connector(), headers=self.headers) as session:
+        async with pooled_session(self.url_base, self.headers, verify_ssl=False) as session:
             async with await session.post(url=url, data=data, **kwargs) as resp:
                 if resp.status == 200:
                     return await resp.json()
@@ -151,7 +145,7 @@ class AssetsGatewayClient:
 
         url = f"{self.url_base}/assets/{asset_id}/images/{filename}"
 
-        async with aiohttp.ClientSession(connector=self.get_aiohttp_connector(), headers=self.headers) as session:
+        async with pooled_session(self.url_base, self.headers, verify_ssl=False) as session:
             async with await session.delete(url=url, **kwargs) as resp:
                 if resp.status == 200:
                     return await resp.json()
@@ -161,7 +155,7 @@ class AssetsGatewayClient:
 
         url = f"{self.url_base}/cdn/libraries/{library_name}/{version}"
 
-        async with aiohttp.ClientSession(connector=self.get_aiohttp_connector(), headers=self.headers) as session:
+        async with pooled_session(self.url_base, self.headers, verify_ssl=False) as session:
             async with await session.delete(url, **kwargs) as resp:
                 if resp.status == 200:
                     return await resp.json()
@@ -171,7 +165,7 @@ class AssetsGatewayClient:
 
         url = f"{self.url_base}/cdn/libraries/{library_name}/{version}"
 
-        async with aiohttp.ClientSession(connector=self.get_aiohttp_connector(), headers=self.headers) as session:
+        async with pooled_session(self.url_base, self.headers, verify_ssl=False) as session:
             async with await session.get(url, **kwargs) as resp:
                 if resp.status == 200:
                     return await resp.read()
@@ -181,7 +175,7 @@ class AssetsGatewayClient:
 
         url = f"{self.url_base}/cdn/queries/loading-graph"
 
-        async with aiohttp.ClientSession(connector=self.get_aiohttp_connector(), headers=self.headers) as session:
+        async with pooled_session(self.url_base, self.headers, verify_ssl=False) as session:
             async with await session.post(url, json=body, **kwargs) as resp:
                 if resp.status == 200:
                     return await resp.json()
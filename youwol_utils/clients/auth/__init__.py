@@ -1 +1,2 @@
 from .auth import *
+from .jwks import *
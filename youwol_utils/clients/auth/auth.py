@@ -1,8 +1,8 @@
 
 from typing import Dict
-import aiohttp
 from dataclasses import dataclass, field
 
+from youwol_utils.clients.http_sessions import pooled_session
 from youwol_utils.clients.utils import raise_exception_from_response
 from youwol_utils.types import JSON
 
@@ -12,17 +12,28 @@ class AuthClient:
 
     url_base: str
     headers: Dict[str, str] = field(default_factory=lambda: {})
-    connector = aiohttp.TCPConnector(verify_ssl=False)
 
     @property
     def user_info_url(self):
         return f"{self.url_base}/realms/youwol/protocol/openid-connect/userinfo"
 
+    @property
+    def jwks_url(self):
+        return f"{self.url_base}/realms/youwol/protocol/openid-connect/certs"
+
     async def get_userinfo(self, bearer_token: str, **kwargs) -> JSON:
 
         headers = {**self.headers, **{'Authorization': f"Bearer {bearer_token}"}}
-        async with aiohttp.ClientSession(headers=headers) as session:
+        async with pooled_session(self.url_base, headers) as session:
             async with await session.post(url=self.user_info_url, **kwargs) as resp:
                 if resp.status == 200:
                     return await resp.json()
                 await raise_exception_from_response(resp, **kwargs)
+
+    async def get_jwks(self, **kwargs) -> JSON:
+
+        async with pooled_session(self.url_base, self.headers) as session:
+            async with await session.get(url=self.jwks_url, **kwargs) as resp:
+                if resp.status == 200:
+                    return await resp.json()
+                await raise_exception_from_response(resp, **kwargs)
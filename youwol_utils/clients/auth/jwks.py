@@ -0,0 +1,88 @@
+import asyncio
+import time
+from typing import Dict, List, Union, Any
+
+from dataclasses import dataclass, field
+from fastapi import HTTPException
+
+from youwol_utils.clients.auth.auth import AuthClient
+from youwol_utils.types import JSON
+
+user_info_claims = ["sub", "email_verified", "name", "preferred_username", "given_name", "family_name", "email",
+                    "memberof"]
+
+
+@dataclass(frozen=False)
+class JwksValidator:
+    """
+    Validates bearer tokens offline using the signing keys of the realm (JWKS), requires 'PyJWT[crypto]'.
+
+    Keys are fetched once and cached by 'kid'; a token signed with an unknown 'kid' (keys rotation) triggers a
+    refresh of the key set, at most once every 'min_refresh_interval' seconds.
+    'aud' and 'iss' claims are checked only if 'audience' and 'issuer' are provided.
+    """
+
+    auth_client: AuthClient
+    audience: Union[str, None] = None
+    issuer: Union[str, None] = None
+    algorithms: List[str] = field(default_factory=lambda: ["RS256"])
+    leeway: float = 0
+    min_refresh_interval: float = 30
+
+    # kid => public key
+    keys: Dict[str, Any] = field(init=False, default_factory=dict)
+    last_refresh: float = field(init=False, default=-float('inf'))
+    refreshing: Union[asyncio.Future, None] = field(init=False, default=None)
+
+    def __post_init__(self):
+        import jwt
+        self.jwt = jwt
+
+    def set_keys(self, jwks: JSON):
+        keys = [self.jwt.PyJWK(jwk) for jwk in jwks["keys"] if jwk.get("use", "sig") == "sig"]
+        self.keys = {key.key_id: key.key for key in keys}
+
+    async def refresh_keys(self):
+
+        if self.refreshing is None:
+            self.refreshing = asyncio.ensure_future(self.auth_client.get_jwks())
+        future = self.refreshing
+        try:
+            jwks = await asyncio.shield(future)
+        finally:
+            if self.refreshing is future:
+                self.refreshing = None
+                self.last_refresh = time.monotonic()
+        self.set_keys(jwks)
+
+    async def get_key(self, kid: str):
+
+        if kid not in self.keys and time.monotonic() - self.last_refresh > self.min_refresh_interval:
+            await self.refresh_keys()
+        if kid not in self.keys:
+            raise HTTPException(status_code=401, detail=f"Unknown signing key '{kid}'")
+        return self.keys[kid]
+
+    async def get_claims(self, bearer_token: str) -> JSON:
+
+        try:
+            header = self.jwt.get_unverified_header(bearer_token)
+            key = await self.get_key(header.get("kid"))
+            return self.jwt.decode(
+                bearer_token,
+                key=key,
+                algorithms=self.algorithms,
+                audience=self.audience,
+                issuer=self.issuer,
+                leeway=self.leeway,
+                options={"verify_aud": self.audience is not None, "require": ["exp"]}
+                )
+        except self.jwt.PyJWTError as e:
+            raise HTTPException(status_code=401, detail=f"Invalid token: {e}")
+
+    async def get_userinfo(self, bearer_token: str, **_kwargs) -> JSON:
+        """
+        Same as 'AuthClient.get_userinfo', built from the claims of the token.
+        """
+        claims = await self.get_claims(bearer_token)
+        return {k: claims[k] for k in user_info_claims if k in claims}
@@ -1,2 +1,4 @@
 from .cache import *
 from .local_cache import *
+from .two_tier_cache import *
+from .fetcher import *
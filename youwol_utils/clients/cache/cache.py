@@ -1,5 +1,5 @@
 import json
-from typing import Union
+from typing import Union, List, Mapping, Callable, Any
 
 from dataclasses import dataclass
 
@@ -8,23 +8,66 @@ from youwol_utils.types import JSON
 
 @dataclass(frozen=False)
 class CacheClient:
+    """
+    Redis cache using the asyncio client of 'redis' (>= 4.2), connections are shared within a pool.
+    Values are (de)serialized using 'serialize'/'deserialize' (JSON by default).
+    """
 
     host: str = ""
     prefix: str = ""
+    port: int = 6379
+    max_connections: int = 50
+    serialize: Callable[[Any], Union[str, bytes]] = json.dumps
+    deserialize: Callable[[Union[str, bytes]], Any] = json.loads
 
     def __post_init__(self):
         try:
-            import redis
-            self.cache = redis.Redis(host=self.host)
-        except:
+            import redis.asyncio as redis
+            self.pool = redis.ConnectionPool(host=self.host, port=self.port, max_connections=self.max_connections)
+            self.cache = redis.Redis(connection_pool=self.pool)
+        except ImportError:
             pass
 
     async def get(self, name: str, **kwargs) -> Union[JSON, None]:
-        val = self.cache.get(name=self._get_key(name))
-        return json.loads(val) if val else None
+        val = await self.cache.get(name=self._get_key(name))
+        return self.deserialize(val) if val else None
 
     async def set(self, name: str, value: JSON, ex: int, **kwargs):
-        return self.cache.set(name=self._get_key(name), value=json.dumps(value), ex=ex)
+        return await self.cache.set(name=self._get_key(name), value=self.serialize(value), ex=ex)
+
+    async def delete(self, name: str, **kwargs) -> bool:
+        return await self.cache.delete(self._get_key(name)) > 0
+
+    async def mget(self, names: List[str], **kwargs) -> List[Union[JSON, None]]:
+        values = await self.cache.mget([self._get_key(name) for name in names])
+        return [self.deserialize(val) if val else None for val in values]
+
+    async def mset(self, values: Mapping[str, JSON], ex: int, **kwargs) -> bool:
+        """
+        MSET does not support expiration: the SET commands are pipelined in one round trip instead.
+        """
+        async with self.pipeline() as pipe:
+            for name, value in values.items():
+                pipe.set(name=self._get_key(name), value=self.serialize(value), ex=ex)
+            results = await pipe.execute()
+        return all(results)
+
+    def pipeline(self):
+        return self.cache.pipeline(transaction=False)
+
+    async def publish(self, channel: str, message: JSON) -> int:
+        return await self.cache.publish(self._get_key(channel), json.dumps(message))
+
+    def pubsub(self):
+        return self.cache.pubsub(ignore_subscribe_messages=True)
+
+    @staticmethod
+    async def close_pubsub(pubsub):
+        # 'aclose' since redis 5.0.1, 'reset' before
+        await (pubsub.aclose() if hasattr(pubsub, "aclose") else pubsub.reset())
+
+    async def close(self):
+        await self.pool.disconnect()
 
     def _get_key(self, name: str):
         return self.prefix + name
@@ -0,0 +1,74 @@
+import asyncio
+import math
+import random
+import time
+from typing import Union, Dict, Callable, Awaitable
+
+from dataclasses import dataclass, field
+
+from youwol_utils.clients.cache.cache import CacheClient
+from youwol_utils.clients.cache.local_cache import LocalCacheClient
+from youwol_utils.clients.cache.two_tier_cache import TwoTierCacheClient
+from youwol_utils.clients.utils import log_error
+from youwol_utils.types import JSON
+
+
+@dataclass(frozen=False)
+class CacheFetcher:
+    """
+    Read-through cache protected against stampedes:
+        *  concurrent misses on the same key share a single call to 'fetch' (single-flight)
+        *  an entry is refreshed in the background with a probability increasing as its expiration
+        gets closer ('XFetch' early recomputation), while the current value keeps being served.
+
+    Entries are stored as {"value", "expiry", "delta"} under 'prefix' + name, 'delta' being the duration of the
+    'fetch' call that produced the value.
+    """
+
+    cache: Union[CacheClient, LocalCacheClient, TwoTierCacheClient]
+    ex: int = 3600
+    beta: float = 1.0
+    prefix: str = "fetcher:"
+    in_flight: Dict[str, asyncio.Future] = field(default_factory=dict)
+
+    async def get(self, name: str, fetch: Callable[[], Awaitable[JSON]]) -> JSON:
+
+        entry = await self.cache.get(self.prefix + name)
+        if not entry:
+            return await self._single_flight(name, fetch)
+
+        if self._should_refresh(entry) and name not in self.in_flight:
+            self._start(name, fetch).add_done_callback(self._log_refresh_error)
+        return entry["value"]
+
+    def _should_refresh(self, entry: JSON) -> bool:
+        gap = -entry["delta"] * self.beta * math.log(1 - random.random())
+        return time.time() + gap >= entry["expiry"]
+
+    async def _single_flight(self, name: str, fetch: Callable[[], Awaitable[JSON]]) -> JSON:
+
+        future = self.in_flight.get(name, None) or self._start(name, fetch)
+        # a caller being cancelled should not cancel the fetch shared with the others
+        return await asyncio.shield(future)
+
+    def _start(self, name: str, fetch: Callable[[], Awaitable[JSON]]) -> asyncio.Future:
+
+        future = asyncio.ensure_future(self._fetch_and_store(name, fetch))
+        self.in_flight[name] = future
+        future.add_done_callback(lambda _: self.in_flight.pop(name, None))
+        return future
+
+    async def _fetch_and_store(self, name: str, fetch: Callable[[], Awaitable[JSON]]) -> JSON:
+
+        start = time.time()
+        value = await fetch()
+        now = time.time()
+        entry = {"value": value, "expiry": now + self.ex, "delta": now - start}
+        await self.cache.set(self.prefix + name, entry, ex=self.ex)
+        return value
+
+    @staticmethod
+    def _log_refresh_error(future: asyncio.Future):
+        if not future.cancelled() and future.exception():
+            log_error("Background refresh of a cache entry failed", str(future.exception()))
+
@@ -1,30 +1,94 @@
-from typing import Union
+import json
+import time
+from collections import OrderedDict
+from typing import Union, Tuple, Any, Dict, List, Mapping
 
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 
 from youwol_utils.types import JSON
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=False)
 class LocalCacheClient:
-
-    cache = {}
+    """
+    In-process cache with per key expiration ('ex', in seconds) and LRU eviction once 'max_count' entries
+    or 'max_size' bytes (estimated from the JSON serialization of the values) are reached.
+    """
 
     prefix: str = ""
+    max_count: int = 10000
+    max_size: int = 64 * 1024 * 1024
+
+    hits: int = field(init=False, default=0)
+    misses: int = field(init=False, default=0)
+    evictions: int = field(init=False, default=0)
+    expirations: int = field(init=False, default=0)
+    size: int = field(init=False, default=0)
+    # key => (value, expiration time or None, size), from least to most recently used
+    entries: Dict[str, Tuple[Any, Union[float, None], int]] = field(init=False, default_factory=OrderedDict)
 
     async def set(self, name: str, value: any, ex: int,  **kwargs) -> bool:
 
         key = self._get_key(name)
-        self.cache[key] = value
+        self._remove(key)
+        size = len(json.dumps(value, default=str))
+        if size > self.max_size:
+            return False
+        expiration = time.monotonic() + ex if ex else None
+        self.entries[key] = (value, expiration, size)
+        self.size += size
+        while len(self.entries) > self.max_count or self.size > self.max_size:
+            oldest = next(iter(self.entries))
+            self._remove(oldest)
+            self.evictions += 1
         return True
 
     async def get(self, name: str, **kwargs) -> Union[JSON, None]:
 
         key = self._get_key(name)
-        if key not in self.cache:
+        if key not in self.entries:
+            self.misses += 1
+            return None
+
+        value, expiration, _ = self.entries[key]
+        if expiration is not None and expiration <= time.monotonic():
+            self._remove(key)
+            self.expirations += 1
+            self.misses += 1
             return None
 
-        return self.cache[key]
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    async def mget(self, names: List[str], **kwargs) -> List[Union[JSON, None]]:
+
+        return [await self.get(name) for name in names]
+
+    async def mset(self, values: Mapping[str, JSON], ex: int, **kwargs) -> bool:
+
+        return all([await self.set(name, value, ex) for name, value in values.items()])
+
+    async def delete(self, name: str, **kwargs) -> bool:
+
+        return self._remove(self._get_key(name))
+
+    async def clear(self, **kwargs):
+
+        self.entries.clear()
+        self.size = 0
+
+    @property
+    def stats(self) -> JSON:
+        return {"count": len(self.entries), "size": self.size, "hits": self.hits, "misses": self.misses,
+                "evictions": self.evictions, "expirations": self.expirations}
+
+    def _remove(self, key: str) -> bool:
+        entry = self.entries.pop(key, None)
+        if entry is None:
+            return False
+        self.size -= entry[2]
+        return True
 
     def _get_key(self, name: str):
         return self.prefix + name
@@ -0,0 +1,119 @@
+import asyncio
+import json
+import uuid
+from typing import Union, List, Mapping
+
+from dataclasses import dataclass, field
+
+from youwol_utils.clients.cache.cache import CacheClient
+from youwol_utils.clients.cache.local_cache import LocalCacheClient
+from youwol_utils.clients.utils import log_error, log_info
+from youwol_utils.types import JSON
+
+
+@dataclass(frozen=False)
+class TwoTierCacheClient:
+    """
+    Serves from an in-process LRU cache ('l1') first, falls back to redis ('l2').
+
+    Writes go to both tiers and are published on a redis channel: the other replicas drop the
+    corresponding entries from their 'l1'. Entries stay at most 'l1_ttl' seconds in 'l1', this bounds
+    the staleness if an invalidation message is lost.
+    """
+
+    l2: CacheClient
+    l1: LocalCacheClient = field(default_factory=lambda: LocalCacheClient(max_count=1000))
+    l1_ttl: int = 60
+    channel: str = "cache-invalidation"
+    replica_id: str = field(default_factory=lambda: str(uuid.uuid4()))
+    listener: Union[asyncio.Task, None] = None
+
+    async def get(self, name: str, **kwargs) -> Union[JSON, None]:
+
+        self._ensure_listener()
+        value = await self.l1.get(name)
+        if value is not None:
+            return value
+
+        value = await self.l2.get(name)
+        if value is not None:
+            await self.l1.set(name, value, ex=self.l1_ttl)
+        return value
+
+    async def set(self, name: str, value: JSON, ex: int, **kwargs):
+
+        self._ensure_listener()
+        result = await self.l2.set(name, value, ex)
+        await self.l1.set(name, value, ex=min(ex, self.l1_ttl) if ex else self.l1_ttl)
+        await self._invalidate([name])
+        return result
+
+    async def delete(self, name: str, **kwargs) -> bool:
+
+        result = await self.l2.delete(name)
+        await self.l1.delete(name)
+        await self._invalidate([name])
+        return result
+
+    async def mget(self, names: List[str], **kwargs) -> List[Union[JSON, None]]:
+
+        self._ensure_listener()
+        values = await self.l1.mget(names)
+        missing = [name for name, value in zip(names, values) if value is None]
+        if not missing:
+            return values
+
+        from_l2 = dict(zip(missing, await self.l2.mget(missing)))
+        await self.l1.mset({k: v for k, v in from_l2.items() if v is not None}, ex=self.l1_ttl)
+        return [value if value is not None else from_l2[name] for name, value in zip(names, values)]
+
+    async def mset(self, values: Mapping[str, JSON], ex: int, **kwargs) -> bool:
+
+        self._ensure_listener()
+        result = await self.l2.mset(values, ex)
+        await self.l1.mset(values, ex=min(ex, self.l1_ttl) if ex else self.l1_ttl)
+        await self._invalidate(list(values.keys()))
+        return result
+
+    async def close(self):
+        if self.listener:
+            self.listener.cancel()
+            # the listener closes its subscription once cancelled
+            await asyncio.wait([self.listener])
+            self.listener = None
+
+    async def _invalidate(self, names: List[str]):
+        await self.l2.publish(self.channel, {"replica": self.replica_id, "names": names})
+
+    def _ensure_listener(self):
+        if self.listener is None or self.listener.done():
+            self.listener = asyncio.ensure_future(self._listen())
+
+    async def _listen(self):
+
+        while True:
+            pubsub = self.l2.pubsub()
+            try:
+                await pubsub.subscribe(self.l2.prefix + self.channel)
+                # invalidations may have been missed while not subscribed
+                await self.l1.clear()
+                log_info("Listening cache invalidations", channel=self.channel)
+                async for message in pubsub.listen():
+                    if message["type"] != "message":
+                        continue
+                    content = json.loads(message["data"])
+                    if content["replica"] == self.replica_id:
+                        continue
+                    for name in content["names"]:
+                        await self.l1.delete(name)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                log_error("Cache invalidations listener failed, retry in 1s", str(e))
+            finally:
+                # releases the connection of the subscription
+                try:
+                    await self.l2.close_pubsub(pubsub)
+                except Exception as e:
+                    log_error("Failed to close the cache invalidations subscription", str(e))
+            await asyncio.sleep(1)
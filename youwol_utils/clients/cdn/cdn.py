@@ -3,9 +3,9 @@ import hashlib
 from dataclasses import field, dataclass
 from pathlib import Path
 from typing import Dict, Union, List
-import aiohttp
 
 from youwol_utils.clients import raise_exception_from_response
+from youwol_utils.clients.http_sessions import pooled_session, coalesced_get
 
 
 def md5_update_from_file(filename: Union[str, Path], current_hash):
@@ -60,7 +60,7 @@ class CdnClient:
     async def query_packs(self, namespace: str = None, **kwargs):
 
         url = self.packs_url if not namespace else f"{self.packs_url}?namespace={namespace}"
-        async with aiohttp.ClientSession(headers=self.headers) as session:
+        async with pooled_session(self.url_base, self.headers) as session:
             async with await session.get(url=url, **kwargs) as resp:
                 if resp.status == 200:
                     return await resp.json()
@@ -68,7 +68,7 @@ class CdnClient:
 
     async def query_libraries(self, **kwargs):
 
-        async with aiohttp.ClientSession(headers=self.headers) as session:
+        async with pooled_session(self.url_base, self.headers) as session:
             async with await session.get(url=self.libraries_url, **kwargs) as resp:
                 if resp.status == 200:
                     return await resp.json()
@@ -76,7 +76,7 @@ class CdnClient:
 
     async def query_dependencies_latest(self, libraries: List[str], **kwargs):
 
-        async with aiohttp.ClientSession(headers=self.headers) as session:
+        async with pooled_session(self.url_base, self.headers) as session:
             async with await session.post(url=self.dependencies_url, json={"libraries": libraries}, **kwargs) as resp:
                 if resp.status == 200:
                     return await resp.json()
@@ -84,7 +84,7 @@ class CdnClient:
 
     async def query_loading_graph(self, body: any, **kwargs):
 
-        async with aiohttp.ClientSession(headers=self.headers) as session:
+        async with pooled_session(self.url_base, self.headers) as session:
             async with await session.post(url=self.loading_graph_url, json=body, **kwargs) as resp:
                 if resp.status == 200:
                     return await resp.json()
@@ -92,7 +92,7 @@ class CdnClient:
 
     async def get_json(self, url: Union[Path, str], **kwargs):
 
-        async with aiohttp.ClientSession(headers=self.headers) as session:
+        async with pooled_session(self.url_base, self.headers) as session:
             async with await session.get(url=f"{self.url_base}/{str(url)}", **kwargs) as resp:
                 if resp.status == 200:
                     return await resp.json()
@@ -101,16 +101,20 @@ class CdnClient:
     async def get_library(self, library_id: str, version: str, **kwargs):
 
         url = f"{self.url_base}/libraries/{library_id}/{version}"
-        async with aiohttp.ClientSession(headers=self.headers) as session:
-            async with await session.get(url=url, **kwargs) as resp:
-                if resp.status == 200:
-                    return await resp.json()
-                await raise_exception_from_response(resp, url=url, headers=self.headers)
+
+        async def fetch():
+            async with pooled_session(self.url_base, self.headers) as session:
+                async with await session.get(url=url, **kwargs) as resp:
+                    if resp.status == 200:
+                        return await resp.json()
+                    await raise_exception_from_response(resp, url=url, headers=self.headers)
+
+        return await coalesced_get(url, {**self.headers, **(kwargs.get('headers') or {})}, kwargs.get('params'), fetch)
 
     async def get_versions(self, library_id: str, **kwargs):
 
         url = f"{self.url_base}/libraries/{library_id}"
-        async with aiohttp.ClientSession(headers=self.headers) as session:
+        async with pooled_session(self.url_base, self.headers) as session:
             async with await session.get(url=url, **kwargs) as resp:
                 if resp.status == 200:
                     return await resp.json()
@@ -119,7 +123,7 @@ class CdnClient:
     async def publish(self, zip_path: Union[Path, str], **kwargs):
 
         files = {'file': open(zip_path, 'rb')}
-        async with aiohttp.ClientSession(headers=self.headers) as session:
+        async with pooled_session(self.url_base, self.headers) as session:
             async with await session.post(self.publish_url, data=files, **kwargs) as resp:
                 if resp.status == 200:
                     return await resp.json()
@@ -128,7 +132,7 @@ class CdnClient:
     async def sync(self, zip_path: Union[Path, str], **kwargs):
 
         files = {'file': open(zip_path, 'rb')}
-        async with aiohttp.ClientSession(headers=self.headers) as session:
+        async with pooled_session(self.url_base, self.headers) as session:
             async with await session.post(self.push_url, data=files, **kwargs) as resp:
                 if resp.status == 200:
                     return await resp.json()
@@ -138,7 +142,7 @@ class CdnClient:
 
         url = f"{self.url_base}/libraries/{library_name}/{version}"
 
-        async with aiohttp.ClientSession(headers=self.headers) as session:
+        async with pooled_session(self.url_base, self.headers) as session:
             async with await session.delete(url, **kwargs) as resp:
                 if resp.status == 200:
                     return await resp.json()
@@ -148,7 +152,7 @@ class CdnClient:
 
         url = f"{self.url_base}/libraries/{library_name}/{version}"
 
-        async with aiohttp.ClientSession(headers=self.headers) as session:
+        async with pooled_session(self.url_base, self.headers) as session:
             async with await session.get(url, **kwargs) as resp:
                 if resp.status == 200:
                     return await resp.read()
@@ -158,7 +162,7 @@ class CdnClient:
 
         url = f"{self.url_base}/records"
 
-        async with aiohttp.ClientSession(headers=self.headers) as session:
+        async with pooled_session(self.url_base, self.headers) as session:
             async with await session.post(url, json=body, **kwargs) as resp:
                 if resp.status == 200:
                     return await resp.json()
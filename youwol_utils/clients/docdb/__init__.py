@@ -1,2 +1,5 @@
 from .docdb import *
 from .local_docdb import *
+from .local_docdb_sqlite import LocalDocDbSqliteClient
+from .loader import DocumentsLoader
+from .cached_docdb import CachedDocDbClient
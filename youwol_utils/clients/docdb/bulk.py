@@ -0,0 +1,86 @@
+import asyncio
+from typing import Union, Iterable, AsyncIterable, AsyncIterator, Callable, Awaitable, List, Tuple, Any
+
+from fastapi import HTTPException
+
+from youwol_utils.clients.docdb.models import TableBody
+from youwol_utils.types import JSON
+
+Documents = Union[Iterable[JSON], AsyncIterable[JSON]]
+
+
+async def iterate(docs: Documents) -> AsyncIterator[JSON]:
+
+    if hasattr(docs, '__aiter__'):
+        async for doc in docs:
+            yield doc
+        return
+    for doc in docs:
+        yield doc
+
+
+def ensure_primary_key(doc: JSON, table_body: TableBody) -> JSON:
+
+    missing = [c for c in table_body.partition_key + table_body.clustering_columns if c not in doc]
+    if missing:
+        raise HTTPException(status_code=400, detail=f"Missing primary key columns {missing}")
+    return doc
+
+
+def bulk_error(index: int, error: Exception) -> JSON:
+
+    if isinstance(error, HTTPException):
+        return {"index": index, "status": error.status_code, "detail": error.detail}
+    return {"index": index, "status": 500, "detail": f"{type(error).__name__}: {error}"}
+
+
+def bulk_result(count: int, errors: List[JSON]) -> JSON:
+    """
+    Result of the bulk operations: 'count' documents processed, 'errors' reported per document with their
+    'index' in the input.
+    """
+    return {"count": count, "errors": sorted(errors, key=lambda e: e["index"])}
+
+
+async def run_bulk(docs: Documents, write: Callable[[JSON], Awaitable[Any]], concurrency: int) -> JSON:
+    """
+    Calls 'write' on each of 'docs' with at most 'concurrency' calls in flight, 'docs' is consumed as the calls
+    complete. A failed call is reported in the result and does not stop the others.
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+    errors = []
+    pending = set()
+
+    async def run(index: int, doc: JSON):
+        try:
+            await write(doc)
+        except Exception as e:
+            errors.append(bulk_error(index, e))
+        finally:
+            semaphore.release()
+
+    count = 0
+    async for doc in iterate(docs):
+        await semaphore.acquire()
+        task = asyncio.ensure_future(run(count, doc))
+        pending.add(task)
+        task.add_done_callback(pending.discard)
+        count += 1
+    await asyncio.gather(*pending)
+    return bulk_result(count, errors)
+
+
+async def prepare_bulk(docs: Documents, prepare: Callable[[JSON], Any]) -> Tuple[List[Any], int, List[JSON]]:
+    """
+    Applies 'prepare' on each of 'docs' (e.g. to validate them before a single write), returns the prepared
+    items, the count of documents and the errors of the documents for which 'prepare' raised.
+    """
+    items, errors = [], []
+    count = 0
+    async for doc in iterate(docs):
+        try:
+            items.append(prepare(doc))
+        except Exception as e:
+            errors.append(bulk_error(count, e))
+        count += 1
+    return items, count, errors
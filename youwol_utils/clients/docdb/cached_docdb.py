@@ -0,0 +1,158 @@
+import copy
+import hashlib
+import json
+from typing import Dict, Union, Mapping, Any, Callable, Awaitable
+
+from dataclasses import dataclass, field
+from fastapi import HTTPException
+
+from youwol_utils.clients.cache import CacheClient, LocalCacheClient, TwoTierCacheClient
+from youwol_utils.clients.docdb.bulk import Documents, iterate
+from youwol_utils.clients.docdb.docdb import DocDbClient
+from youwol_utils.clients.docdb.local_docdb import LocalDocDbClient
+from youwol_utils.clients.docdb.local_docdb_in_memory import LocalDocDbInMemoryClient
+from youwol_utils.clients.docdb.local_docdb_sqlite import LocalDocDbSqliteClient
+from youwol_utils.clients.docdb.models import QueryBody
+from youwol_utils.clients.http_sessions import auth_scope
+from youwol_utils.types import JSON
+
+
+@dataclass(frozen=False)
+class CachedDocDbClient:
+    """
+    Caches the results of 'get_document' & 'query' of 'doc_db' per owner for 'ttl' seconds, documents not found are
+    cached for 'negative_ttl' seconds. Other methods are forwarded to 'doc_db'.
+
+    Writes through this client ('create_document', 'update_document', 'delete_document') invalidate the cached
+    document and all the cached queries of the owner; writes made by other means are seen after at most 'ttl'.
+    """
+
+    doc_db: Union[DocDbClient, LocalDocDbClient, LocalDocDbInMemoryClient, LocalDocDbSqliteClient]
+    cache: Union[CacheClient, LocalCacheClient, TwoTierCacheClient] = field(default_factory=LocalCacheClient)
+    ttl: int = 60
+    negative_ttl: int = 5
+    prefix: str = "docdb:"
+
+    hits: int = field(init=False, default=0)
+    negative_hits: int = field(init=False, default=0)
+    misses: int = field(init=False, default=0)
+    # owner => version of its queries, incremented at each write
+    generations: Dict[str, int] = field(init=False, default_factory=dict)
+
+    def __getattr__(self, name: str):
+        if name == "doc_db":
+            raise AttributeError(name)
+        return getattr(self.doc_db, name)
+
+    async def get_document(self, partition_keys: Dict[str, Any], clustering_keys: Dict[str, Any],
+                           owner: Union[str, None], **kwargs):
+
+        key = self._document_key({**partition_keys, **clustering_keys}, owner, kwargs.get('headers', None))
+        entry = await self.cache.get(key)
+        if entry and "document" in entry:
+            self.hits += 1
+            return copy.deepcopy(entry["document"])
+        if entry:
+            self.negative_hits += 1
+            raise HTTPException(status_code=404, detail=entry["missing"])
+
+        self.misses += 1
+        try:
+            doc = await self.doc_db.get_document(partition_keys=partition_keys, clustering_keys=clustering_keys,
+                                                 owner=owner, **kwargs)
+        except HTTPException as e:
+            if e.status_code == 404:
+                await self.cache.set(key, {"missing": str(e.detail)}, ex=self.negative_ttl)
+            raise e
+        await self.cache.set(key, {"document": doc}, ex=self.ttl)
+        return copy.deepcopy(doc)
+
+    async def query(self, query_body: Union[QueryBody, str], owner: Union[str, None], **kwargs):
+
+        if isinstance(query_body, str):
+            query_body = QueryBody.parse(query_body)
+
+        scope = self._owner_scope(owner, kwargs.get('headers', None))
+        digest = hashlib.sha1(query_body.json().encode()).hexdigest()
+        key = f"{self.prefix}query:{scope}:{self.generations.get(scope, 0)}:{digest}"
+        entry = await self.cache.get(key)
+        if entry:
+            self.hits += 1
+            return copy.deepcopy(entry)
+
+        self.misses += 1
+        resp = await self.doc_db.query(query_body=query_body, owner=owner, **kwargs)
+        await self.cache.set(key, resp, ex=self.ttl)
+        return copy.deepcopy(resp)
+
+    async def create_document(self, doc, owner: Union[str, None], **kwargs):
+
+        resp = await self.doc_db.create_document(doc=doc, owner=owner, **kwargs)
+        await self._invalidate(doc, owner, kwargs.get('headers', None))
+        return resp
+
+    async def update_document(self, doc, owner: Union[str, None], **kwargs):
+
+        resp = await self.doc_db.update_document(doc=doc, owner=owner, **kwargs)
+        await self._invalidate(doc, owner, kwargs.get('headers', None))
+        return resp
+
+    async def delete_document(self, doc: Dict[str, Any], owner: Union[str, None], **kwargs):
+
+        resp = await self.doc_db.delete_document(doc=doc, owner=owner, **kwargs)
+        await self._invalidate(doc, owner, kwargs.get('headers', None))
+        return resp
+
+    async def create_documents(self, docs: Documents, owner: Union[str, None], **kwargs) -> JSON:
+        return await self._bulk(self.doc_db.create_documents, docs, owner, **kwargs)
+
+    async def update_documents(self, docs: Documents, owner: Union[str, None], **kwargs) -> JSON:
+        return await self._bulk(self.doc_db.update_documents, docs, owner, **kwargs)
+
+    async def delete_documents(self, docs: Documents, owner: Union[str, None], **kwargs) -> JSON:
+        return await self._bulk(self.doc_db.delete_documents, docs, owner, **kwargs)
+
+    @property
+    def stats(self) -> JSON:
+        total = self.hits + self.negative_hits + self.misses
+        return {"hits": self.hits, "negative_hits": self.negative_hits, "misses": self.misses,
+                "hit_rate": (self.hits + self.negative_hits) / total if total else 0}
+
+    async def _invalidate(self, doc: Dict[str, Any], owner: Union[str, None], headers: Mapping[str, str]):
+
+        scope = self._owner_scope(owner, headers)
+        self.generations[scope] = self.generations.get(scope, 0) + 1
+        await self.cache.delete(self._document_key(doc, owner, headers))
+
+    async def _bulk(self, write: Callable[..., Awaitable[JSON]], docs: Documents, owner: Union[str, None],
+                    **kwargs) -> JSON:
+
+        headers = kwargs.get('headers', None)
+        keys = []
+
+        async def tap():
+            async for doc in iterate(docs):
+                try:
+                    keys.append(self._document_key(doc, owner, headers))
+                except KeyError:
+                    # reported as error by 'write'
+                    pass
+                yield doc
+
+        resp = await write(docs=tap(), owner=owner, **kwargs)
+        scope = self._owner_scope(owner, headers)
+        self.generations[scope] = self.generations.get(scope, 0) + 1
+        for key in keys:
+            await self.cache.delete(key)
+        return resp
+
+    def _document_key(self, doc: Dict[str, Any], owner: Union[str, None], headers: Mapping[str, str]) -> str:
+
+        table_body = self.doc_db.table_body
+        primary_key = [doc[k] for k in table_body.partition_key + table_body.clustering_columns]
+        return f"{self.prefix}document:{self._owner_scope(owner, headers)}:{json.dumps(primary_key, default=str)}"
+
+    def _owner_scope(self, owner: Union[str, None], headers: Mapping[str, str]) -> str:
+        # without owner, the owner is determined by docdb from the headers
+        owner = owner if owner else json.dumps(auth_scope(headers))
+        return f"{self.doc_db.keyspace_name}.{self.doc_db.table_name}:{owner}"
@@ -1,11 +1,14 @@
 from enum import Enum
-from typing import Dict, Union, List, NamedTuple
-import aiohttp
+from typing import Dict, Union, List, NamedTuple, AsyncIterator
 from aiohttp import ClientResponse
 from dataclasses import dataclass, field
 
+from youwol_utils.clients.docdb.bulk import Documents, run_bulk
 from youwol_utils.clients.docdb.models import TableBody, QueryBody, SecondaryIndex
+from youwol_utils.clients.docdb.pagination import iter_query
+from youwol_utils.clients.http_sessions import pooled_session, coalesced_get
 from youwol_utils.clients.utils import raise_exception_from_response, aiohttp_resp_parameters
+from youwol_utils.types import JSON
 
 
 def post_keyspace_body(name: str, replication_factor: int):
@@ -71,7 +74,6 @@ class DocDbClient:
     replication_factor: int
 
     headers: Dict[str, str] = field(default_factory=lambda: {})
-    connector = aiohttp.TCPConnector(verify_ssl=False)
 
     secondary_indexes: List[SecondaryIndex] = field(default_factory=lambda: [])
 
@@ -125,7 +127,7 @@ class DocDbClient:
 
     async def _keyspace_exists(self, **kwargs) -> bool:
 
-        async with aiohttp.ClientSession(headers=self.headers) as session:
+        async with pooled_session(self.url_base, self.headers) as session:
             async with await session.get(url=self.keyspaces_url, **kwargs) as resp:
                 if resp.status == 200:
                     resp_json = await resp.json()
@@ -134,7 +136,7 @@ class DocDbClient:
 
     async def _table_exists(self, **kwargs) -> bool:
 
-        async with aiohttp.ClientSession(headers=self.headers) as session:
+        async with pooled_session(self.url_base, self.headers) as session:
             async with await session.get(url=self.tables_url, **kwargs) as resp:
                 if resp.status == 200:
                     resp_json = await resp.json()
@@ -146,7 +148,7 @@ class DocDbClient:
         if not await self._keyspace_exists(**kwargs) or not await self._table_exists(**kwargs):
             return
 
-        async with aiohttp.ClientSession(headers=self.headers) as session:
+        async with pooled_session(self.url_base, self.headers) as session:
             async with await session.delete(url=self.table_url, **kwargs) as resp:
                 if resp.status == 200:
                     resp_json = await resp.text()
@@ -158,7 +160,7 @@ class DocDbClient:
 
         body_json = post_keyspace_body(self.keyspace_name, self.replication_factor)
 
-        async with aiohttp.ClientSession(headers=self.headers) as session:
+        async with pooled_session(self.url_base, self.headers) as session:
             async with await session.post(url=self.post_keyspace_url, json=body_json, **kwargs) as resp:
                 if resp.status == 201:
                     print(f"keyspace '{self.keyspace_name}' created")
@@ -175,7 +177,7 @@ class DocDbClient:
             del body['table_options']['clustering_order']
             # if not body['table_options']:
             #    del body['table_options']
-        async with aiohttp.ClientSession(headers=self.headers) as session:
+        async with pooled_session(self.url_base, self.headers) as session:
             async with await session.post(url=self.post_table_url, json=body, **kwargs) as resp:
                 if resp.status == 201:
                     print(f"table '{self.table_name}' created")
@@ -187,7 +189,7 @@ class DocDbClient:
 
         body = index.dict()
 
-        async with aiohttp.ClientSession(headers=self.headers) as session:
+        async with pooled_session(self.url_base, self.headers) as session:
             async with await session.post(url=self.post_index_url, json=body, **kwargs) as resp:
                 if resp.status == 201:
                     print(f"secondary index '{index.name}' created")
@@ -235,7 +237,7 @@ class DocDbClient:
 
     async def get_table(self, **kwargs):
 
-        async with aiohttp.ClientSession(headers=self.headers) as session:
+        async with pooled_session(self.url_base, self.headers) as session:
             async with await session.get(url=self.table_url, **kwargs) as resp:
                 if resp.status == 200:
                     table = await resp.json()
@@ -248,34 +250,53 @@ class DocDbClient:
 
         params = {"owner": owner}
         params_part = self.get_primary_key_query_parameters({**partition_keys, **clustering_keys})
+        url = self.document_url+params_part
 
-        async with aiohttp.ClientSession(headers=self.headers) as session:
-            async with await session.get(url=self.document_url+params_part, params=params, **kwargs) as resp:
-                if resp.status == 200:
-                    resp = await resp.json()
-                    return resp
+        async def fetch():
+            async with pooled_session(self.url_base, self.headers) as session:
+                async with await session.get(url=url, params=params, **kwargs) as resp:
+                    if resp.status == 200:
+                        resp = await resp.json()
+                        return resp
 
-                await self.raise_exception(resp, message="Can not get the document", params=params)
+                    await self.raise_exception(resp, message="Can not get the document", params=params)
 
-    async def query(self, query_body: Union[QueryBody, str], owner: Union[str, None], **kwargs):
+        return await coalesced_get(url, {**self.headers, **(kwargs.get('headers') or {})}, params, fetch)
 
+    async def query(self, query_body: Union[QueryBody, str], owner: Union[str, None], **kwargs):
+        """
+        At most 'max_results' documents; the 'iterator' of the service is returned only if no document has been
+        dropped to respect it (it would skip them otherwise).
+        """
         if isinstance(query_body, str):
             query_body = QueryBody.parse(query_body)
 
+        resp = await self._query(query_body=query_body, owner=owner, **kwargs)
+        documents = resp["documents"]
+        if len(documents) > query_body.max_results:
+            return {"documents": documents[0:query_body.max_results], "iterator": None}
+        return resp
+
+    async def _query(self, query_body: QueryBody, owner: Union[str, None], **kwargs):
+
         params = {"owner": owner} if owner else {}
-        async with aiohttp.ClientSession(headers=self.headers) as session:
+        async with pooled_session(self.url_base, self.headers) as session:
             async with await session.post(url=self.query_url, json=query_body.dict(), params=params, **kwargs) as resp:
                 if resp.status == 200:
                     resp = await resp.json()
-                    return {"documents": resp["documents"][0:query_body.max_results]}
+                    return {"documents": resp["documents"], "iterator": resp.get("iterator", None)}
 
                 await self.raise_exception(resp, message="Query failed", params=params, query_body=query_body)
 
+    def iter_query(self, query_body: Union[QueryBody, str], owner: Union[str, None], **kwargs) -> AsyncIterator[JSON]:
+        # pages are not truncated: all the documents of a page are yielded before following its iterator
+        return iter_query(self._query, query_body, owner, **kwargs)
+
     async def create_document(self, doc,  owner: Union[str, None], **kwargs):
 
         params = {"owner": owner} if owner else {}
 
-        async with aiohttp.ClientSession(headers=self.headers) as session:
+        async with pooled_session(self.url_base, self.headers) as session:
             async with await session.post(url=self.document_url, json=doc, params=params, **kwargs) as resp:
                 if resp.status == 201:
                     return await resp.json()
@@ -285,7 +306,7 @@ class DocDbClient:
 
         params = {"owner": owner} if owner else {}
 
-        async with aiohttp.ClientSession(headers=self.headers) as session:
+        async with pooled_session(self.url_base, self.headers) as session:
             async with await session.put(url=self.document_url, json=doc, params=params, **kwargs) as resp:
                 if resp.status == 200:
                     return await resp.json()
@@ -295,12 +316,24 @@ class DocDbClient:
 
         params_part = self.get_primary_key_query_parameters(doc)
         params = {"owner": owner} if owner else {}
-        async with aiohttp.ClientSession(headers=self.headers) as session:
+        async with pooled_session(self.url_base, self.headers) as session:
             async with await session.delete(url=self.document_url + params_part, params=params, **kwargs) as resp:
                 if resp.status == 200:
                     return await resp.json()
                 await self.raise_exception(resp, message="Can not delete the document", params=params_part, doc=doc)
 
+    async def create_documents(self, docs: Documents, owner: Union[str, None], concurrency: int = 10,
+                               **kwargs) -> JSON:
+        return await run_bulk(docs, lambda doc: self.create_document(doc, owner, **kwargs), concurrency)
+
+    async def update_documents(self, docs: Documents, owner: Union[str, None], concurrency: int = 10,
+                               **kwargs) -> JSON:
+        return await run_bulk(docs, lambda doc: self.update_document(doc, owner, **kwargs), concurrency)
+
+    async def delete_documents(self, docs: Documents, owner: Union[str, None], concurrency: int = 10,
+                               **kwargs) -> JSON:
+        return await run_bulk(docs, lambda doc: self.delete_document(doc, owner, **kwargs), concurrency)
+
     def get_primary_key_query_parameters(self, doc: Dict[str, any]):
 
         if len(self.table_body.partition_key) == 1 and len(self.table_body.clustering_columns) == 0:
@@ -0,0 +1,163 @@
+import asyncio
+import copy
+from typing import Dict, Union, List, Mapping, Tuple, Any
+
+from dataclasses import dataclass, field
+from fastapi import HTTPException
+
+from youwol_utils.clients.docdb.cached_docdb import CachedDocDbClient
+from youwol_utils.clients.docdb.docdb import DocDbClient
+from youwol_utils.clients.docdb.local_docdb import LocalDocDbClient
+from youwol_utils.clients.docdb.local_docdb_in_memory import LocalDocDbInMemoryClient
+from youwol_utils.clients.docdb.local_docdb_sqlite import LocalDocDbSqliteClient
+from youwol_utils.clients.docdb.models import QueryBody, Query, WhereClause
+from youwol_utils.clients.http_sessions import auth_scope
+from youwol_utils.types import JSON
+
+
+@dataclass(frozen=False)
+class Lookup:
+    partition_keys: Dict[str, Any]
+    clustering_keys: Dict[str, Any]
+    owner: Union[str, None]
+    headers: Mapping[str, str]
+    futures: List[asyncio.Future]
+
+
+@dataclass(frozen=False)
+class DocumentsLoader:
+    """
+    Batches the point lookups of 'load' (same as 'get_document' of 'doc_db') issued within the same iteration of
+    the event loop, or within 'window' seconds if provided:
+        *  identical lookups are fetched once, each caller gets its own copy of the document
+        *  if 'doc_db' supports 'in' relations ('supports_in_relation', e.g. the local clients), the lookups of a
+        batch sharing the same owner are resolved by one query with 'in' relations on the primary key columns
+        *  otherwise (e.g. DocDbClient), each batch is fetched with at most 'max_concurrency' concurrent requests.
+    """
+
+    doc_db: Union[DocDbClient, LocalDocDbClient, LocalDocDbInMemoryClient, LocalDocDbSqliteClient,
+                  CachedDocDbClient]
+    window: float = 0
+    max_concurrency: int = 10
+    max_batch: int = 100
+
+    pending: Dict[Tuple, Lookup] = field(init=False, default_factory=dict)
+    scheduled: bool = field(init=False, default=False)
+
+    async def load(self, partition_keys: Dict[str, Any], clustering_keys: Dict[str, Any],
+                   owner: Union[str, None], headers: Mapping[str, str] = None) -> JSON:
+
+        headers = headers or {}
+        key = (owner, auth_scope(headers), self._primary_key(partition_keys, clustering_keys))
+        future = asyncio.get_event_loop().create_future()
+        if key in self.pending:
+            self.pending[key].futures.append(future)
+        else:
+            self.pending[key] = Lookup(partition_keys=partition_keys, clustering_keys=clustering_keys, owner=owner,
+                                       headers=headers, futures=[future])
+        self._schedule()
+        return await future
+
+    async def load_many(self, keys: List[Tuple[Dict[str, Any], Dict[str, Any]]], owner: Union[str, None],
+                        headers: Mapping[str, str] = None) -> List[JSON]:
+
+        return await asyncio.gather(*[self.load(partition_keys, clustering_keys, owner, headers)
+                                      for partition_keys, clustering_keys in keys])
+
+    def _schedule(self):
+
+        if self.scheduled:
+            return
+        self.scheduled = True
+        loop = asyncio.get_event_loop()
+        if self.window:
+            loop.call_later(self.window, self._dispatch)
+        else:
+            loop.call_soon(self._dispatch)
+
+    def _dispatch(self):
+
+        lookups = list(self.pending.values())
+        self.pending = {}
+        self.scheduled = False
+        by_owner: Dict[Tuple, List[Lookup]] = {}
+        for lookup in lookups:
+            by_owner.setdefault((lookup.owner, auth_scope(lookup.headers)), []).append(lookup)
+
+        for group in by_owner.values():
+            for i in range(0, len(group), self.max_batch):
+                asyncio.ensure_future(self._resolve(group[i:i + self.max_batch]))
+
+    async def _resolve(self, lookups: List[Lookup]):
+
+        # CachedDocDbClient forwards the attribute of the client it wraps
+        if not getattr(self.doc_db, 'supports_in_relation', False):
+            await self._resolve_individually(lookups)
+            return
+        try:
+            documents = await self._query(lookups)
+        except Exception as e:
+            for lookup in lookups:
+                self._set_exception(lookup, e)
+            return
+        for lookup in lookups:
+            doc = documents.get(self._primary_key(lookup.partition_keys, lookup.clustering_keys), None)
+            if doc is None:
+                self._set_exception(lookup, HTTPException(status_code=404, detail="document not found in doc_db"))
+            else:
+                self._set_result(lookup, doc)
+
+    async def _query(self, lookups: List[Lookup]) -> Dict[Tuple, JSON]:
+
+        table_body = self.doc_db.table_body
+        columns = table_body.partition_key + table_body.clustering_columns
+        values = {column: list({self._column_value(lookup, column) for lookup in lookups}) for column in columns}
+        max_results = 1
+        for column_values in values.values():
+            max_results *= len(column_values)
+        query = QueryBody(
+            max_results=max_results,
+            query=Query(where_clause=[WhereClause(column=column, relation="in", term=values[column])
+                                      for column in columns])
+            )
+        response = await self.doc_db.query(query_body=query, owner=lookups[0].owner, headers=lookups[0].headers)
+        return {tuple(doc[column] for column in columns): doc for doc in response["documents"]}
+
+    async def _resolve_individually(self, lookups: List[Lookup]):
+
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async def resolve(lookup: Lookup):
+            async with semaphore:
+                try:
+                    doc = await self.doc_db.get_document(partition_keys=lookup.partition_keys,
+                                                         clustering_keys=lookup.clustering_keys,
+                                                         owner=lookup.owner, headers=lookup.headers)
+                except Exception as e:
+                    self._set_exception(lookup, e)
+                    return
+                self._set_result(lookup, doc)
+
+        await asyncio.gather(*[resolve(lookup) for lookup in lookups])
+
+    def _primary_key(self, partition_keys: Dict[str, Any], clustering_keys: Dict[str, Any]) -> Tuple:
+
+        table_body = self.doc_db.table_body
+        return tuple([partition_keys[k] for k in table_body.partition_key] +
+                     [clustering_keys[k] for k in table_body.clustering_columns])
+
+    @staticmethod
+    def _column_value(lookup: Lookup, column: str):
+        return lookup.partition_keys[column] if column in lookup.partition_keys else lookup.clustering_keys[column]
+
+    @staticmethod
+    def _set_result(lookup: Lookup, doc: JSON):
+        for future in lookup.futures:
+            if not future.done():
+                future.set_result(copy.deepcopy(doc))
+
+    @staticmethod
+    def _set_exception(lookup: Lookup, error: Exception):
+        for future in lookup.futures:
+            if not future.done():
+                future.set_exception(error)
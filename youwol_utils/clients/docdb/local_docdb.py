@@ -1,13 +1,17 @@
+import copy
 import shutil
 from pathlib import Path
-import json
-from typing import Mapping, Union, Dict, List
+from typing import Mapping, Union, Dict, List, AsyncIterator
 
 from dataclasses import dataclass, field
 from fastapi import HTTPException
 
+from youwol_utils.clients.docdb.bulk import Documents, prepare_bulk, bulk_result, ensure_primary_key
+from youwol_utils.clients.docdb.local_table import get_local_store, LocalTableStore, stores
 from youwol_utils.clients.docdb.models import TableBody, QueryBody, WhereClause, Query, SecondaryIndex
+from youwol_utils.clients.docdb.pagination import iter_query
 from youwol_utils.clients.utils import get_default_owner
+from youwol_utils.types import JSON
 
 
 @dataclass(frozen=True)
@@ -18,6 +22,8 @@ class LocalDocDbClient:
     table_body: TableBody
     version_table: str
     secondary_indexes: List[SecondaryIndex] = field(default_factory=lambda: [])
+    # the queries support 'in' relations (see DocumentsLoader)
+    supports_in_relation = True
 
     @property
     def table_name(self):
@@ -35,11 +41,16 @@ class LocalDocDbClient:
     def metadata_path(self):
         return self.base_path / "metadata.json"
 
+    @property
+    def store(self) -> LocalTableStore:
+        return get_local_store(self.base_path, self.table_body, self.secondary_indexes)
+
     def primary_key_id(self, doc: Dict[str, any]):
         return str([[k, doc[k]] for k in self.table_body.partition_key] +
                    [[k, doc[k]] for k in self.table_body.clustering_columns])
 
     async def delete_table(self, **_kwargs):
+        stores.pop(self.base_path, None)
         if self.base_path.exists():
             shutil.rmtree(self.base_path)
 
@@ -53,7 +64,7 @@ class LocalDocDbClient:
         return True
 
     async def clear_data(self, **_kwargs):
-        self.data_path.open('w').write('{"documents":[]}')
+        await self.store.clear()
 
     async def get_document(self, partition_keys: Dict[str, any], clustering_keys: Dict[str, any],
                            owner: Union[str, None], **kwargs):
@@ -86,27 +97,29 @@ class LocalDocDbClient:
         if not owner:
             owner = get_default_owner(headers)
 
+        return await self._query(query_body, WhereClause(column="owner", relation="eq", term=owner))
+
+    async def query_owners(self, query_body: Union[QueryBody, str], owners: List[str], **_kwargs):
+        """
+        Same as 'query' for the documents of any of 'owners' in a single pass, 'max_results' applies to the total.
+        """
+        return await self._query(query_body, WhereClause(column="owner", relation="in", term=owners))
+
+    async def _query(self, query_body: Union[QueryBody, str], owner_clause: WhereClause):
+
         if isinstance(query_body, str):
             query_body = QueryBody.parse(query_body)
 
         if len(query_body.query.ordering_clause) > 1:
             raise Exception("Ordering emulated only for 1 ordering clause")
 
-        eq_clauses = [clause for clause in query_body.query.where_clause if clause.relation == "eq"] + \
-                     [WhereClause(column="owner", relation="eq", term=owner)]
-
-        data = json.loads(self.data_path.read_text())["documents"]
+        clauses = query_body.query.where_clause + [owner_clause]
+        r, iterator = self.store.table.page(clauses, query_body.max_results, query_body.iterator)
 
-        r = [d for d in data if all([d[clause.column] == clause.term for clause in eq_clauses])]
-        for ordering in self.table_body.table_options.clustering_order:
-            order = ordering.order
-            col = ordering.name
-            sorted_result = sorted(r, key=lambda doc: doc[col])
-            r = sorted_result
-            if order == "DESC":
-                r.reverse()
+        return {"documents": copy.deepcopy(r), "iterator": iterator}
 
-        return {"documents": r[0:query_body.max_results]}
+    def iter_query(self, query_body: Union[QueryBody, str], owner: Union[str, None], **kwargs) -> AsyncIterator[JSON]:
+        return iter_query(self.query, query_body, owner, **kwargs)
 
     async def create_document(self, doc, owner: Union[str, None], headers: Mapping[str, str] = None, **_kwargs):
 
@@ -121,14 +134,7 @@ class LocalDocDbClient:
 
         doc["owner"] = owner
 
-        data = json.load(self.data_path.open('r')) if self.data_path.exists() else {"documents": []}
-        index = [i for i, d in enumerate(data["documents"]) if self.primary_key_id(d) == self.primary_key_id(doc)]
-        if len(index) == 1:
-            data["documents"][index[0]] = doc
-        else:
-            data["documents"].append(doc)
-
-        self.data_path.open('w').write(json.dumps(data, indent=4))
+        await self.store.upsert([copy.deepcopy(doc)])
         return {}
 
     async def delete_document(self, doc: Dict[str, any], owner: Union[str, None],  headers: Mapping[str, str] = None,
@@ -139,10 +145,43 @@ class LocalDocDbClient:
         if not owner:
             owner = get_default_owner(headers)
 
-        data = json.load(self.data_path.open())
+        await self.store.delete([self.primary_key_id(doc)], owner)
+        return {}
 
-        data["documents"] = [d for d in data["documents"]
-                             if not(self.primary_key_id(d) == self.primary_key_id(doc) and d["owner"] == owner)]
+    async def create_documents(self, docs: Documents, owner: Union[str, None], headers: Mapping[str, str] = None,
+                               **_kwargs) -> JSON:
 
-        self.data_path.write_text(json.dumps(data, indent=4))
-        return {}
+        return await self.update_documents(docs, owner, headers, **_kwargs)
+
+    async def update_documents(self, docs: Documents, owner: Union[str, None], headers: Mapping[str, str] = None,
+                               **_kwargs) -> JSON:
+
+        if not headers:
+            headers = {}
+        if not owner:
+            owner = get_default_owner(headers)
+
+        def prepare(doc):
+            ensure_primary_key(doc, self.table_body)
+            doc["owner"] = owner
+            return copy.deepcopy(doc)
+
+        items, count, errors = await prepare_bulk(docs, prepare)
+        await self.store.upsert(items)
+        return bulk_result(count, errors)
+
+    async def delete_documents(self, docs: Documents, owner: Union[str, None], headers: Mapping[str, str] = None,
+                               **_kwargs) -> JSON:
+
+        if not headers:
+            headers = {}
+        if not owner:
+            owner = get_default_owner(headers)
+
+        def prepare(doc):
+            ensure_primary_key(doc, self.table_body)
+            return self.primary_key_id(doc)
+
+        keys, count, errors = await prepare_bulk(docs, prepare)
+        await self.store.delete(keys, owner)
+        return bulk_result(count, errors)
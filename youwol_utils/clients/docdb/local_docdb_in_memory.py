@@ -1,16 +1,28 @@
+import asyncio
 import json
 from pathlib import Path
-from typing import Mapping, Union, Any, Dict, List
+from typing import Mapping, Union, Dict, List, AsyncIterator
 
 from dataclasses import dataclass, field
 from fastapi import HTTPException
 
+from youwol_utils.clients.docdb.bulk import Documents, prepare_bulk, bulk_result, ensure_primary_key
+from youwol_utils.clients.docdb.local_table import read_local_table, LocalTable, write_atomic
 from youwol_utils.clients.docdb.models import TableBody, QueryBody, Query, WhereClause, SecondaryIndex
-from youwol_utils.clients.utils import get_default_owner
+from youwol_utils.clients.docdb.pagination import iter_query
+from youwol_utils.clients.utils import get_default_owner, log_error
+from youwol_utils.types import JSON
 
 
 @dataclass(frozen=False)
 class LocalDocDbInMemoryClient:
+    """
+    Documents are loaded from 'data.json' at construction and then only live in memory, they are written back
+    to 'data.json' by 'save_snapshot', or periodically if 'snapshot_period' (in seconds) is provided.
+
+    'data.log' (see LocalTableStore) is replayed at construction but never modified: a snapshot records the position
+    in the log it includes, the records appended after it are replayed at the next loading.
+    """
 
     root_path: Path
     keyspace_name: str
@@ -18,7 +30,14 @@ class LocalDocDbInMemoryClient:
     table_body: TableBody
     version_table: str
     secondary_indexes: List[SecondaryIndex] = field(default_factory=lambda: [])
-    data: Any = None
+    snapshot_period: Union[float, None] = None
+    table: Union[LocalTable, None] = field(init=False, default=None)
+    # position of the end of 'data.log' at loading
+    log_position: Union[JSON, None] = field(init=False, default=None)
+    dirty: bool = field(init=False, default=False)
+    snapshot_task: Union[asyncio.Task, None] = field(init=False, default=None)
+    # the queries support 'in' relations (see DocumentsLoader)
+    supports_in_relation = True
 
     @property
     def table_name(self):
@@ -36,8 +55,42 @@ class LocalDocDbInMemoryClient:
         return str([[k, doc[k]] for k in self.table_body.partition_key] +
                    [[k, doc[k]] for k in self.table_body.clustering_columns])
 
+    @property
+    def log_path(self):
+        return self.base_path / "data.log"
+
+    @property
+    def data(self):
+        return {"documents": self.table.all_documents(), "log": self.log_position}
+
     def __post_init__(self):
-        self.data = json.loads(self.data_path.read_text())
+        documents, self.log_position = read_local_table(self.base_path)
+        self.table = LocalTable(table_body=self.table_body, secondary_indexes=self.secondary_indexes,
+                                documents=documents)
+
+    def _on_write(self):
+        self.dirty = True
+        if self.snapshot_period and (not self.snapshot_task or self.snapshot_task.done()):
+            self.snapshot_task = asyncio.ensure_future(self._snapshot_loop())
+
+    async def _snapshot_loop(self):
+        while self.dirty:
+            await asyncio.sleep(self.snapshot_period)
+            try:
+                await self.save_snapshot()
+            except Exception as e:
+                # retried at the next period
+                self.dirty = True
+                log_error(f"Failed to save the snapshot of '{self.data_path}'", str(e))
+
+    async def save_snapshot(self):
+
+        if not self.dirty:
+            return
+        self.dirty = False
+        # serialized here: the documents may be modified by the event loop while the file is written
+        content = json.dumps(self.data, indent=4)
+        await asyncio.get_event_loop().run_in_executor(None, write_atomic, self.data_path, content, False)
 
     async def delete_table(self, **_kwargs):
         pass
@@ -46,7 +99,8 @@ class LocalDocDbInMemoryClient:
         pass
 
     async def clear_data(self, **_kwargs):
-        self.data["documents"] = []
+        self.table.clear()
+        self._on_write()
 
     async def get_document(self,  partition_keys: Dict[str, any], clustering_keys: Dict[str, any],
                            owner: Union[str, None], **kwargs):
@@ -79,27 +133,29 @@ class LocalDocDbInMemoryClient:
         if not owner:
             owner = get_default_owner(headers)
 
+        return await self._query(query_body, WhereClause(column="owner", relation="eq", term=owner))
+
+    async def query_owners(self, query_body: Union[QueryBody, str], owners: List[str], **_kwargs):
+        """
+        Same as 'query' for the documents of any of 'owners' in a single pass, 'max_results' applies to the total.
+        """
+        return await self._query(query_body, WhereClause(column="owner", relation="in", term=owners))
+
+    async def _query(self, query_body: Union[QueryBody, str], owner_clause: WhereClause):
+
         if isinstance(query_body, str):
             query_body = QueryBody.parse(query_body)
 
         if len(query_body.query.ordering_clause) > 1:
             raise Exception("Ordering emulated only for 1 ordering clause")
 
-        eq_clauses = [clause for clause in query_body.query.where_clause if clause.relation == "eq"] + \
-                     [WhereClause(column="owner", relation="eq", term=owner)]
+        clauses = query_body.query.where_clause + [owner_clause]
+        r, iterator = self.table.page(clauses, query_body.max_results, query_body.iterator)
 
-        data = self.data["documents"]
+        return {"documents": r, "iterator": iterator}
 
-        r = [d for d in data if all([d[clause.column] == clause.term for clause in eq_clauses])]
-        for ordering in self.table_body.table_options.clustering_order:
-            order = ordering.order
-            col = ordering.name
-            sorted_result = sorted(r, key=lambda doc: doc[col])
-            r = sorted_result
-            if order == "DESC":
-                r.reverse()
-
-        return {"documents": r[0:query_body.max_results]}
+    def iter_query(self, query_body: Union[QueryBody, str], owner: Union[str, None], **kwargs) -> AsyncIterator[JSON]:
+        return iter_query(self.query, query_body, owner, **kwargs)
 
     async def create_document(self, doc, owner: Union[str, None], headers: Mapping[str, str] = None, **_kwargs):
 
@@ -113,13 +169,8 @@ class LocalDocDbInMemoryClient:
             owner = get_default_owner(headers)
 
         doc["owner"] = owner
-
-        index = [i for i, d in enumerate(self.data["documents"]) if self.primary_key_id(d) == self.primary_key_id(doc)]
-        if len(index) == 1:
-            self.data["documents"][index[0]] = doc
-        else:
-            self.data["documents"].append(doc)
-
+        self.table.upsert(doc)
+        self._on_write()
         return {}
 
     async def delete_document(self, doc, owner: Union[str, None],  headers: Mapping[str, str] = None,
@@ -129,7 +180,49 @@ class LocalDocDbInMemoryClient:
         if not owner:
             owner = get_default_owner(headers)
 
-        self.data["documents"] = [d for d in self.data["documents"]
-                                  if not(self.primary_key_id(d) == self.primary_key_id(doc) and d["owner"] == owner)]
+        if self.table.delete(self.primary_key_id(doc), owner):
+            self._on_write()
 
         return {}
+
+    async def create_documents(self, docs: Documents, owner: Union[str, None], headers: Mapping[str, str] = None,
+                               **_kwargs) -> JSON:
+
+        return await self.update_documents(docs, owner, headers, **_kwargs)
+
+    async def update_documents(self, docs: Documents, owner: Union[str, None], headers: Mapping[str, str] = None,
+                               **_kwargs) -> JSON:
+
+        if not headers:
+            headers = {}
+        if not owner:
+            owner = get_default_owner(headers)
+
+        def prepare(doc):
+            ensure_primary_key(doc, self.table_body)
+            doc["owner"] = owner
+            return doc
+
+        items, count, errors = await prepare_bulk(docs, prepare)
+        for doc in items:
+            self.table.upsert(doc)
+        if items:
+            self._on_write()
+        return bulk_result(count, errors)
+
+    async def delete_documents(self, docs: Documents, owner: Union[str, None], headers: Mapping[str, str] = None,
+                               **_kwargs) -> JSON:
+
+        if not headers:
+            headers = {}
+        if not owner:
+            owner = get_default_owner(headers)
+
+        def prepare(doc):
+            ensure_primary_key(doc, self.table_body)
+            return self.primary_key_id(doc)
+
+        keys, count, errors = await prepare_bulk(docs, prepare)
+        if [key for key in keys if self.table.delete(key, owner)]:
+            self._on_write()
+        return bulk_result(count, errors)
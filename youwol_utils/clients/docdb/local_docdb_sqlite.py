@@ -0,0 +1,410 @@
+import asyncio
+import json
+import shutil
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Mapping, Union, Dict, List, Any, Tuple, Callable, AsyncIterator
+
+from dataclasses import dataclass, field
+from fastapi import HTTPException
+
+from youwol_utils.clients.docdb.bulk import Documents, prepare_bulk, bulk_result, ensure_primary_key
+from youwol_utils.clients.docdb.local_table import read_local_table
+from youwol_utils.clients.docdb.models import TableBody, QueryBody, WhereClause, SecondaryIndex, OrderingClause
+from youwol_utils.clients.docdb.pagination import iter_query, to_iterator, from_iterator
+from youwol_utils.clients.utils import get_default_owner
+from youwol_utils.types import JSON
+
+SQL_TYPES = {
+    "text": "TEXT", "ascii": "TEXT", "varchar": "TEXT", "uuid": "TEXT", "timeuuid": "TEXT",
+    "int": "INTEGER", "bigint": "INTEGER", "smallint": "INTEGER", "tinyint": "INTEGER", "varint": "INTEGER",
+    "counter": "INTEGER", "timestamp": "INTEGER", "boolean": "INTEGER",
+    "float": "REAL", "double": "REAL", "decimal": "REAL"
+    }
+
+SQL_RELATIONS = {"eq": "=", "lt": "<", "lte": "<=", "gt": ">", "gte": ">=", "in": "IN"}
+
+# internal columns: owner & serialized document, named such that they do not collide with the table's columns
+OWNER_COLUMN = "_owner"
+DOC_COLUMN = "_doc"
+
+
+def quote(identifier: str) -> str:
+    return '"' + identifier.replace('"', '""') + '"'
+
+
+def to_sql_value(value: Any):
+    if value is None or isinstance(value, (str, int, float, bool)):
+        return value
+    return json.dumps(value)
+
+
+def read_sqlite_documents(db_path: Path) -> List[JSON]:
+    """
+    Documents of a table stored by LocalDocDbSqliteClient, read without the client (e.g. from another process).
+    """
+    connection = sqlite3.connect(str(db_path))
+    try:
+        return [json.loads(row[0]) for row in connection.execute(f"SELECT {DOC_COLUMN} FROM documents")]
+    finally:
+        connection.close()
+
+
+class SqliteTable:
+    """
+    SQLite database of a local docdb table, all the operations are run in a dedicated thread
+    owning the connection.
+    """
+
+    def __init__(self, db_path: Path, table_body: TableBody, secondary_indexes: List[SecondaryIndex]):
+
+        self.db_path = db_path
+        self.table_body = table_body
+        self.secondary_indexes = secondary_indexes
+        declared = {c.name: c.type for c in table_body.columns}
+        # the owner of the documents is stored in the internal column
+        declared.pop("owner", None)
+        reserved = [name for name in [OWNER_COLUMN, DOC_COLUMN] if name in declared]
+        if reserved:
+            raise Exception(f"Columns {reserved} of table '{table_body.name}' are reserved by the SQLite storage")
+        self.columns: Dict[str, str] = declared
+        self.primary_columns = table_body.partition_key + table_body.clustering_columns
+        self.executor = ThreadPoolExecutor(max_workers=1)
+        self.connection: Union[sqlite3.Connection, None] = None
+
+    async def run(self, fct: Callable[[sqlite3.Connection], Any]):
+        return await asyncio.get_event_loop().run_in_executor(self.executor, self._run, fct)
+
+    def _run(self, fct: Callable[[sqlite3.Connection], Any]):
+        if not self.connection:
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+            connection = sqlite3.connect(str(self.db_path))
+            try:
+                connection.execute("PRAGMA journal_mode=WAL")
+                connection.execute("PRAGMA synchronous=NORMAL")
+                self._create(connection)
+            except Exception:
+                # creation (or import) is attempted again by the next operation
+                connection.close()
+                raise
+            self.connection = connection
+        return fct(self.connection)
+
+    async def close(self):
+        def _close():
+            if self.connection:
+                self.connection.close()
+                self.connection = None
+        await asyncio.get_event_loop().run_in_executor(self.executor, _close)
+        self.executor.shutdown(wait=False)
+
+    def _create(self, connection: sqlite3.Connection):
+
+        columns = [f"{quote(name)} {SQL_TYPES.get(kind.split('<')[0].lower(), '')}".strip()
+                   for name, kind in self.columns.items()]
+        primary_key = ", ".join(self.column_expression(c) for c in self.primary_columns)
+        clustering = [self.column_expression(o.name) + (" DESC" if o.order == "DESC" else "")
+                      for o in self.table_body.table_options.clustering_order]
+        # the write lock is taken before checking: the table is created and filled by one connection only
+        connection.execute("BEGIN IMMEDIATE")
+        exists = connection.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'documents'")\
+            .fetchone()
+        with connection:
+            connection.execute(f"CREATE TABLE IF NOT EXISTS documents ({', '.join(columns)}, {OWNER_COLUMN} TEXT, "
+                               f"{DOC_COLUMN} TEXT NOT NULL, PRIMARY KEY ({primary_key}))")
+            connection.execute(f"CREATE INDEX IF NOT EXISTS owner_index ON documents "
+                               f"({', '.join([OWNER_COLUMN] + clustering)})")
+            for index in self.secondary_indexes:
+                connection.execute(f"CREATE INDEX IF NOT EXISTS {quote(index.name)} ON documents "
+                                   f"({quote(index.identifier.column_name)})")
+            if not exists:
+                # documents of the table stored by LocalDocDbClient/LocalDocDbInMemoryClient in the same folder (if
+                # any), imported in the transaction creating the table
+                documents, _ = read_local_table(self.db_path.parent)
+                connection.executemany(self.upsert_sql(), [self.row(doc) for doc in documents])
+
+    def column_expression(self, column: str) -> str:
+        if column == "owner":
+            return OWNER_COLUMN
+        if column in self.columns:
+            return quote(column)
+        # columns not declared in the table's schema are read from the document itself
+        path = '$.' + quote(column)
+        return f"json_extract({DOC_COLUMN}, '" + path.replace("'", "''") + "')"
+
+    def where(self, clauses: List[WhereClause]) -> Tuple[str, List[Any]]:
+
+        conditions, params = [], []
+        for clause in clauses:
+            if clause.relation not in SQL_RELATIONS:
+                raise HTTPException(status_code=400, detail=f"Relation '{clause.relation}' not supported")
+            column = self.column_expression(clause.column)
+            if clause.relation == "in":
+                terms = list(clause.term)
+                conditions.append(f"{column} IN ({', '.join('?' for _ in terms)})")
+                params += [to_sql_value(term) for term in terms]
+                continue
+            conditions.append(f"{column} {SQL_RELATIONS[clause.relation]} ?")
+            params.append(to_sql_value(clause.term))
+        return " AND ".join(conditions) if conditions else "1", params
+
+    def ordering(self, ordering: List[OrderingClause]) -> List[Tuple[str, bool]]:
+        """
+        (expression, descending) of the query's order, 'rowid' ends it such that the order is total.
+        """
+        ordering = ordering or self.table_body.table_options.clustering_order
+        return [(self.column_expression(o.name), o.order == "DESC") for o in ordering] + [("rowid", False)]
+
+    @staticmethod
+    def order_by(ordering: List[Tuple[str, bool]]) -> str:
+        return " ORDER BY " + ", ".join(f"{expression} {'DESC' if desc else 'ASC'}" for expression, desc in ordering)
+
+    @staticmethod
+    def after(ordering: List[Tuple[str, bool]], position: List[Any]) -> Tuple[str, List[Any]]:
+        """
+        Condition selecting the rows following 'position' (values of the ordering's expressions) in the order
+        'ordering' (keyset pagination); NULLs come first in ascending order, last in descending order.
+        """
+        alternatives, params = [], []
+        for i, (expression, desc) in enumerate(ordering):
+            conditions, alternative_params = [], []
+            for previous, value in zip(ordering[0:i], position[0:i]):
+                conditions.append(f"{previous[0]} IS ?")
+                alternative_params.append(value)
+            value = position[i]
+            if value is None and desc:
+                continue
+            if value is None:
+                conditions.append(f"{expression} IS NOT NULL")
+            elif desc:
+                conditions.append(f"({expression} < ? OR {expression} IS NULL)")
+                alternative_params.append(value)
+            else:
+                conditions.append(f"{expression} > ?")
+                alternative_params.append(value)
+            alternatives.append("(" + " AND ".join(conditions) + ")")
+            params += alternative_params
+        return "(" + " OR ".join(alternatives) + ")" if alternatives else "0", params
+
+    def row(self, doc: JSON) -> List[Any]:
+        return [to_sql_value(doc.get(name, None)) for name in self.columns] + [doc.get("owner", None), json.dumps(doc)]
+
+    def upsert_sql(self) -> str:
+        names = [quote(name) for name in self.columns] + [OWNER_COLUMN, DOC_COLUMN]
+        return f"INSERT OR REPLACE INTO documents ({', '.join(names)}) VALUES ({', '.join('?' for _ in names)})"
+
+    def primary_key_where(self) -> str:
+        """
+        Condition selecting a document by primary key & owner.
+        """
+        return " AND ".join(f"{self.column_expression(c)} = ?" for c in self.primary_columns) + f" AND {OWNER_COLUMN} = ?"
+
+
+databases: Dict[Path, SqliteTable] = {}
+
+
+@dataclass(frozen=True)
+class LocalDocDbSqliteClient:
+    """
+    Drop-in for LocalDocDbClient storing the table in a SQLite database ('data.sqlite' in the table's folder):
+    partition keys & clustering columns are the primary key, secondary indexes are SQL indexes,
+    and where/ordering clauses of the queries are translated to SQL.
+
+    When 'data.sqlite' is created, the documents of 'data.json'/'data.log' (if any) are imported; these files are
+    left untouched afterwards: switching back to LocalDocDbClient does not see the writes made through this client.
+    """
+
+    root_path: Path
+    keyspace_name: str
+    table_body: TableBody
+    version_table: str
+    secondary_indexes: List[SecondaryIndex] = field(default_factory=lambda: [])
+    # the queries support 'in' relations (see DocumentsLoader)
+    supports_in_relation = True
+
+    @property
+    def table_name(self):
+        return self.table_body.name
+
+    @property
+    def base_path(self):
+        return self.root_path / self.keyspace_name / self.table_name
+
+    @property
+    def db_path(self):
+        return self.base_path / "data.sqlite"
+
+    @property
+    def database(self) -> SqliteTable:
+        if self.db_path not in databases:
+            databases[self.db_path] = SqliteTable(self.db_path, self.table_body, self.secondary_indexes)
+        return databases[self.db_path]
+
+    async def delete_table(self, **_kwargs):
+        database = databases.pop(self.db_path, None)
+        if database:
+            await database.close()
+        if self.base_path.exists():
+            shutil.rmtree(self.base_path)
+
+    async def ensure_table(self, **_kwargs):
+
+        await self.database.run(lambda _connection: None)
+        return True
+
+    async def clear_data(self, **_kwargs):
+
+        def clear(connection: sqlite3.Connection):
+            with connection:
+                connection.execute("DELETE FROM documents")
+
+        await self.database.run(clear)
+
+    async def get_document(self, partition_keys: Dict[str, any], clustering_keys: Dict[str, any],
+                           owner: Union[str, None], headers: Mapping[str, str] = None, **_kwargs):
+
+        if not headers:
+            headers = {}
+        if not owner:
+            owner = get_default_owner(headers)
+
+        database = self.database
+        keys = {**partition_keys, **clustering_keys}
+        params = [to_sql_value(keys[c]) for c in database.primary_columns] + [owner]
+        sql = f"SELECT {DOC_COLUMN} FROM documents WHERE {database.primary_key_where()}"
+        row = await database.run(lambda connection: connection.execute(sql, params).fetchone())
+        if not row:
+            raise HTTPException(status_code=404, detail="document not found in doc_db: "+str(keys))
+
+        return json.loads(row[0])
+
+    async def query(self, query_body: Union[QueryBody, str], owner: Union[str, None],
+                    headers: Mapping[str, str] = None, **_kwargs):
+
+        if not headers:
+            headers = {}
+        if not owner:
+            owner = get_default_owner(headers)
+
+        return await self._query(query_body, WhereClause(column="owner", relation="eq", term=owner))
+
+    async def query_owners(self, query_body: Union[QueryBody, str], owners: List[str], **_kwargs):
+        """
+        Same as 'query' for the documents of any of 'owners' in a single pass, 'max_results' applies to the total.
+        """
+        return await self._query(query_body, WhereClause(column="owner", relation="in", term=owners))
+
+    async def _query(self, query_body: Union[QueryBody, str], owner_clause: WhereClause):
+
+        if isinstance(query_body, str):
+            query_body = QueryBody.parse(query_body)
+
+        database = self.database
+        where, params = database.where(query_body.query.where_clause + [owner_clause])
+        ordering = database.ordering(query_body.query.ordering_clause)
+        if query_body.iterator:
+            after, after_params = database.after(ordering, from_iterator(query_body.iterator))
+            where, params = f"{where} AND {after}", params + after_params
+        size = query_body.max_results
+        sql = f"SELECT {DOC_COLUMN}, {', '.join(expression for expression, _ in ordering)} FROM documents " \
+              f"WHERE {where}{database.order_by(ordering)} LIMIT ?"
+        rows = await database.run(lambda connection: connection.execute(sql, params + [size]).fetchall())
+
+        iterator = to_iterator(list(rows[-1][1:])) if rows and len(rows) == size else None
+        return {"documents": [json.loads(row[0]) for row in rows], "iterator": iterator}
+
+    def iter_query(self, query_body: Union[QueryBody, str], owner: Union[str, None], **kwargs) -> AsyncIterator[JSON]:
+        return iter_query(self.query, query_body, owner, **kwargs)
+
+    async def create_document(self, doc, owner: Union[str, None], headers: Mapping[str, str] = None, **_kwargs):
+
+        return await self.update_document(doc, owner, headers, **_kwargs)
+
+    async def update_document(self, doc, owner: Union[str, None], headers: Mapping[str, str] = None, **_kwargs):
+
+        if not headers:
+            headers = {}
+        if not owner:
+            owner = get_default_owner(headers)
+
+        doc["owner"] = owner
+        database = self.database
+        row = database.row(doc)
+
+        def upsert(connection: sqlite3.Connection):
+            with connection:
+                connection.execute(database.upsert_sql(), row)
+
+        await database.run(upsert)
+        return {}
+
+    async def delete_document(self, doc: Dict[str, any], owner: Union[str, None], headers: Mapping[str, str] = None,
+                              **_kwargs):
+
+        if not headers:
+            headers = {}
+        if not owner:
+            owner = get_default_owner(headers)
+
+        database = self.database
+        params = [to_sql_value(doc[c]) for c in database.primary_columns] + [owner]
+
+        def delete(connection: sqlite3.Connection):
+            with connection:
+                connection.execute(f"DELETE FROM documents WHERE {database.primary_key_where()}", params)
+
+        await database.run(delete)
+        return {}
+
+    async def create_documents(self, docs: Documents, owner: Union[str, None], headers: Mapping[str, str] = None,
+                               **_kwargs) -> JSON:
+
+        return await self.update_documents(docs, owner, headers, **_kwargs)
+
+    async def update_documents(self, docs: Documents, owner: Union[str, None], headers: Mapping[str, str] = None,
+                               **_kwargs) -> JSON:
+
+        if not headers:
+            headers = {}
+        if not owner:
+            owner = get_default_owner(headers)
+
+        database = self.database
+
+        def prepare(doc):
+            ensure_primary_key(doc, self.table_body)
+            doc["owner"] = owner
+            return database.row(doc)
+
+        rows, count, errors = await prepare_bulk(docs, prepare)
+
+        def upsert(connection: sqlite3.Connection):
+            with connection:
+                connection.executemany(database.upsert_sql(), rows)
+
+        await database.run(upsert)
+        return bulk_result(count, errors)
+
+    async def delete_documents(self, docs: Documents, owner: Union[str, None], headers: Mapping[str, str] = None,
+                               **_kwargs) -> JSON:
+
+        if not headers:
+            headers = {}
+        if not owner:
+            owner = get_default_owner(headers)
+
+        database = self.database
+
+        def prepare(doc):
+            ensure_primary_key(doc, self.table_body)
+            return [to_sql_value(doc[c]) for c in database.primary_columns] + [owner]
+
+        rows, count, errors = await prepare_bulk(docs, prepare)
+
+        def delete(connection: sqlite3.Connection):
+            with connection:
+                connection.executemany(f"DELETE FROM documents WHERE {database.primary_key_where()}", rows)
+
+        await database.run(delete)
+        return bulk_result(count, errors)
@@ -0,0 +1,586 @@
+import asyncio
+import bisect
+import heapq
+import itertools
+import json
+import os
+import uuid
+from pathlib import Path
+from typing import Dict, List, Any, Set, Union, Tuple
+
+from fastapi import HTTPException
+
+from youwol_utils.clients.docdb.models import TableBody, SecondaryIndex, WhereClause
+from youwol_utils.clients.docdb.pagination import to_iterator, from_iterator
+from youwol_utils.clients.utils import log_error
+from youwol_utils.types import JSON
+
+
+def index_key(value: Any):
+    """
+    Key used in the indexes for a column's value: lists or dicts are not hashable and are indexed through their
+    JSON representation.
+    """
+    try:
+        hash(value)
+        return value
+    except TypeError:
+        return json.dumps(value, sort_keys=True)
+
+
+class Top:
+    """
+    Greater than any other value, used to bisect on the upper bound of a range.
+    """
+    def __eq__(self, other):
+        return isinstance(other, Top)
+
+    def __lt__(self, other):
+        return False
+
+    def __gt__(self, other):
+        return not isinstance(other, Top)
+
+
+RELATIONS = {
+    "eq": lambda value, term: value == term,
+    "lt": lambda value, term: value < term,
+    "lte": lambda value, term: value <= term,
+    "gt": lambda value, term: value > term,
+    "gte": lambda value, term: value >= term,
+    "in": lambda value, term: value in term
+    }
+
+
+def match(doc: JSON, clauses: List[WhereClause]) -> bool:
+    try:
+        return all(clause.column in doc and RELATIONS[clause.relation](doc[clause.column], clause.term)
+                   for clause in clauses)
+    except TypeError:
+        return False
+
+
+class LocalTable:
+    """
+    In memory representation of a local docdb table.
+
+    Documents are stored by primary key (partition keys + clustering columns), and the columns 'owner',
+    partition keys and secondary indexes are indexed such that point lookups and eq/in-queries
+    do not need to scan the table. If the table defines a clustering order, the primary keys are also
+    kept sorted in this order: ordered reads and range queries on the first clustering column do not sort.
+
+    The position of a document in the table's order is (sort key, rank), pages of a query resume after the
+    position of the last document returned (keyset pagination, see 'page').
+    """
+
+    def __init__(self, table_body: TableBody, secondary_indexes: List[SecondaryIndex], documents: List[JSON]):
+
+        self.table_body = table_body
+        self.primary_columns = table_body.partition_key + table_body.clustering_columns
+        indexed = ["owner"] + table_body.partition_key + [index.identifier.column_name for index in secondary_indexes]
+        self.indexed_columns = list(dict.fromkeys(indexed))
+        self.ordering = table_body.table_options.clustering_order
+        self.documents: Dict[str, JSON] = {}
+        # insertion rank of the documents, used to return candidates in the table's order
+        self.ranks: Dict[str, int] = {}
+        self.next_rank = 0
+        self.indexes: Dict[str, Dict[Any, Set[str]]] = {column: {} for column in self.indexed_columns}
+        # (sort key, rank, primary key) sorted in ascending clustering order
+        self.ordered: List[Tuple[Tuple, int, str]] = []
+        # (rank, primary key) sorted by rank
+        self.sequence: List[Tuple[int, str]] = []
+        for doc in documents:
+            self.upsert(doc)
+
+    def primary_key_id(self, doc: Dict[str, any]) -> str:
+        return str([[k, doc[k]] for k in self.table_body.partition_key] +
+                   [[k, doc[k]] for k in self.table_body.clustering_columns])
+
+    def sort_key(self, doc: JSON) -> Tuple:
+        return tuple((1, doc[o.name]) if o.name in doc else (0, None) for o in self.ordering)
+
+    @property
+    def descending(self) -> bool:
+        return bool(self.ordering) and {o.order for o in self.ordering} == {"DESC"}
+
+    def position(self, key: str) -> Tuple[Tuple, int]:
+        return self.sort_key(self.documents[key]), self.ranks[key]
+
+    def follows(self, key: str, after: Tuple[Tuple, int]) -> bool:
+        """
+        Whether the document 'key' comes after the position 'after' in the order of the queries' results.
+        """
+        sort_key, rank = self.position(key)
+        try:
+            for i, ordering in enumerate(self.ordering):
+                if sort_key[i] != after[0][i]:
+                    return (sort_key[i] > after[0][i]) != (ordering.order == "DESC")
+        except TypeError:
+            return False
+        return rank < after[1] if self.descending else rank > after[1]
+
+    def __len__(self):
+        return len(self.documents)
+
+    def all_documents(self) -> List[JSON]:
+        return list(self.documents.values())
+
+    def get(self, primary_key_id: str) -> Union[JSON, None]:
+        return self.documents.get(primary_key_id, None)
+
+    def upsert(self, doc: JSON) -> str:
+
+        key = self.primary_key_id(doc)
+        previous = self.documents.get(key, None)
+        if previous is not None:
+            self._unindex(key, previous)
+        else:
+            self.ranks[key] = self.next_rank
+            self.sequence.append((self.next_rank, key))
+            self.next_rank += 1
+        self.documents[key] = doc
+        self._index(key, doc)
+        return key
+
+    def delete(self, primary_key_id: str, owner: str) -> bool:
+
+        doc = self.documents.get(primary_key_id, None)
+        if doc is None or doc.get("owner", None) != owner:
+            return False
+        self._unindex(primary_key_id, doc)
+        rank = self.ranks.pop(primary_key_id)
+        del self.documents[primary_key_id]
+        del self.sequence[bisect.bisect_left(self.sequence, (rank, primary_key_id))]
+        return True
+
+    def clear(self):
+        self.documents.clear()
+        self.ranks.clear()
+        self.indexes = {column: {} for column in self.indexed_columns}
+        self.ordered = []
+        self.sequence = []
+
+    def page(self, clauses: List[WhereClause], max_results: int, iterator: Union[str, None]) \
+            -> Tuple[List[JSON], Union[str, None]]:
+        """
+        Page of 'query' following the position encoded in 'iterator', and the iterator of the next page (None if
+        this one is the last).
+        """
+        after = None
+        if iterator:
+            sort_key, rank = from_iterator(iterator)
+            after = tuple(tuple(entry) for entry in sort_key), rank
+        docs = self.query(clauses, max_results, after)
+        if len(docs) < max_results or not docs:
+            return docs, None
+        return docs, to_iterator(self.position(self.primary_key_id(docs[-1])))
+
+    def query(self, clauses: List[WhereClause], max_results: int, after: Tuple[Tuple, int] = None) -> List[JSON]:
+        """
+        Return the first 'max_results' documents matching all the clauses, in clustering order
+        (or in the table's order if no clustering order is defined), starting after the position 'after' if provided.
+
+        The cheapest access path is selected among: primary key lookup, eq/in on an indexed column,
+        range on the first clustering column, full scan.
+        """
+        for clause in clauses:
+            if clause.relation not in RELATIONS:
+                raise HTTPException(status_code=400, detail=f"Relation '{clause.relation}' not supported")
+
+        terms = {c.column: c.term for c in clauses if c.relation == "eq"}
+        if all(column in terms for column in self.primary_columns):
+            key = self.primary_key_id(terms)
+            doc = self.get(key)
+            return [doc] if doc is not None and match(doc, clauses) and (not after or self.follows(key, after)) \
+                else []
+
+        candidates = self._candidates(clauses)
+        if self.ordering:
+            start, end = self._range(clauses)
+            if candidates is None or end - start <= len(candidates):
+                return self._scan_ordered(start, end, clauses, max_results, after)
+        else:
+            start = bisect.bisect_left(self.sequence, (after[1], Top())) if after else 0
+            if candidates is None or len(self.sequence) - start <= len(candidates):
+                docs = (self.documents[self.sequence[i][1]] for i in range(start, len(self.sequence)))
+                return list(itertools.islice((d for d in docs if match(d, clauses)), max_results))
+
+        keys = [k for k in candidates
+                if match(self.documents[k], clauses) and (not after or self.follows(k, after))]
+        if not self.ordering:
+            return [self.documents[k] for k in heapq.nsmallest(max_results, keys, key=lambda k: self.ranks[k])]
+
+        if len({o.order for o in self.ordering}) > 1:
+            return self._sort(keys)[0:max_results]
+
+        def entry(k):
+            return self.sort_key(self.documents[k]), self.ranks[k]
+
+        top = heapq.nlargest if self.ordering[0].order == "DESC" else heapq.nsmallest
+        return [self.documents[k] for k in top(max_results, keys, key=entry)]
+
+    def _candidates(self, clauses: List[WhereClause]) -> Union[Set[str], None]:
+        """
+        Smallest set of primary keys provided by the indexes for the eq/in clauses, None if no index apply.
+        """
+        best = None
+        for clause in clauses:
+            if clause.column not in self.indexes or clause.relation not in ["eq", "in"]:
+                continue
+            index = self.indexes[clause.column]
+            if clause.relation == "eq":
+                keys = index.get(index_key(clause.term), set())
+            else:
+                keys = set().union(*[index.get(index_key(term), set()) for term in clause.term])
+            if best is None or len(keys) < len(best):
+                best = keys
+        return best
+
+    def _range(self, clauses: List[WhereClause]) -> Tuple[int, int]:
+        """
+        Boundaries in 'ordered' of the entries satisfying the range clauses on the first clustering column.
+        """
+        start, end = 0, len(self.ordered)
+        column = self.ordering[0].name
+        for clause in clauses:
+            if clause.column != column or clause.relation not in ["eq", "lt", "lte", "gt", "gte"]:
+                continue
+            try:
+                if clause.relation in ["eq", "gte", "gt"]:
+                    bound = ((1, clause.term), Top()) if clause.relation == "gt" else ((1, clause.term),)
+                    start = max(start, bisect.bisect_left(self.ordered, (bound,)))
+                if clause.relation in ["eq", "lte", "lt"]:
+                    bound = ((1, clause.term),) if clause.relation == "lt" else ((1, clause.term), Top())
+                    end = min(end, bisect.bisect_left(self.ordered, (bound,)))
+            except TypeError:
+                continue
+        return start, max(start, end)
+
+    def _scan_ordered(self, start: int, end: int, clauses: List[WhereClause], max_results: int,
+                      after: Union[Tuple[Tuple, int], None]) -> List[JSON]:
+
+        if len({o.order for o in self.ordering}) > 1:
+            keys = [k for _, _, k in self.ordered[start:end]
+                    if match(self.documents[k], clauses) and (not after or self.follows(k, after))]
+            return self._sort(keys)[0:max_results]
+
+        if after and self.descending:
+            end = min(end, bisect.bisect_left(self.ordered, after))
+        elif after:
+            start = max(start, bisect.bisect_left(self.ordered, (after[0], after[1], Top())))
+
+        indexes = range(end - 1, start - 1, -1) if self.ordering[0].order == "DESC" else range(start, end)
+        docs = (self.documents[self.ordered[i][2]] for i in indexes)
+        return list(itertools.islice((d for d in docs if match(d, clauses)), max_results))
+
+    def _sort(self, keys: List[str]) -> List[JSON]:
+        """
+        Sort with mixed ASC/DESC clustering orders.
+        """
+        keys = sorted(keys, key=lambda k: self.ranks[k])
+        for i, ordering in reversed(list(enumerate(self.ordering))):
+            keys.sort(key=lambda k: self.sort_key(self.documents[k])[i], reverse=ordering.order == "DESC")
+        return [self.documents[k] for k in keys]
+
+    def _index(self, key: str, doc: JSON):
+        for column, index in self.indexes.items():
+            if column in doc:
+                index.setdefault(index_key(doc[column]), set()).add(key)
+        if self.ordering:
+            bisect.insort(self.ordered, (self.sort_key(doc), self.ranks[key], key))
+
+    def _unindex(self, key: str, doc: JSON):
+        for column, index in self.indexes.items():
+            if column not in doc:
+                continue
+            value = index_key(doc[column])
+            keys = index.get(value, set())
+            keys.discard(key)
+            if not keys and value in index:
+                del index[value]
+        if self.ordering:
+            entry = (self.sort_key(doc), self.ranks[key], key)
+            i = bisect.bisect_left(self.ordered, entry)
+            if i < len(self.ordered) and self.ordered[i] == entry:
+                del self.ordered[i]
+
+
+def file_signature(path: Path) -> Union[Tuple[int, int], None]:
+    if not path.exists():
+        return None
+    stat = path.stat()
+    return stat.st_mtime_ns, stat.st_size
+
+
+def repair_log(log_path: Path):
+    """
+    Truncate the log after its last complete line: a line partially written (crash during an append) would
+    otherwise be prefixed to the next appended record.
+    """
+    if not log_path.exists():
+        return
+    with open(log_path, 'rb+') as fp:
+        content = fp.read()
+        if content and not content.endswith(b"\n"):
+            fp.truncate(content.rfind(b"\n") + 1)
+
+
+def read_log(log_path: Path, after: Union[JSON, None] = None) -> Tuple[List[JSON], Union[JSON, None]]:
+    """
+    Records of an operation log and the position of its end ({"id": log's id, "offset": in bytes}), a last line
+    partially written (crash during an append) is ignored. If 'after' is a position in the same log (same id),
+    only the records appended after it are returned (with the header).
+    """
+    if not log_path.exists():
+        return [], None
+    content = log_path.read_bytes()
+    end = content.rfind(b"\n") + 1
+    if end == 0:
+        return [], None
+    # the first line is a header giving the primary key's columns and the log's id
+    header_end = content.find(b"\n") + 1
+    header = json.loads(content[0:header_end])
+    log_id = header.get("id", None)
+    start = after["offset"] if after and log_id and after.get("id", None) == log_id else header_end
+    records = [json.loads(line) for line in content[start:end].decode().splitlines()]
+    return [header] + records, {"id": log_id, "offset": end}
+
+
+def read_snapshot(data_path: Path) -> JSON:
+    """
+    Content of 'data.json': the documents, and the position in 'data.log' up to which its records are included
+    ('log', if any).
+    """
+    return json.loads(data_path.read_text()) if data_path.exists() else {"documents": []}
+
+
+def read_local_table(base_path: Path) -> Tuple[List[JSON], Union[JSON, None]]:
+    """
+    Documents of a local table folder: the 'data.json' snapshot on which the records of 'data.log'
+    it does not include are replayed; and the position of the end of 'data.log'.
+    """
+    snapshot = read_snapshot(base_path / "data.json")
+    documents = snapshot["documents"]
+    records, position = read_log(base_path / "data.log", snapshot.get("log", None))
+    if not records:
+        return documents, position
+
+    primary_key = records[0]["primary_key"]
+    by_key = {str([[k, doc[k]] for k in primary_key]): doc for doc in documents}
+    for record in records:
+        if record["op"] == "upsert":
+            by_key[record["key"]] = record["doc"]
+        if record["op"] == "delete" and by_key.get(record["key"], {}).get("owner", None) == record["owner"]:
+            del by_key[record["key"]]
+    return list(by_key.values()), position
+
+
+def read_local_documents(base_path: Path) -> List[JSON]:
+    return read_local_table(base_path)[0]
+
+
+def write_atomic(path: Path, content: str, fsync: bool):
+
+    tmp_path = path.parent / f"{path.name}.tmp"
+    with open(tmp_path, 'w') as fp:
+        fp.write(content)
+        fp.flush()
+        if fsync:
+            os.fsync(fp.fileno())
+    os.replace(tmp_path, path)
+
+
+class LocalTableStore:
+    """
+    Persistence of a LocalTable in a folder:
+        *  'data.json': snapshot of the documents
+        *  'data.log': append-only log of the operations (one JSON record per line) done since the snapshot
+
+    Writes are applied in memory right away, their records are appended to the log by a background task that
+    groups the writes issued concurrently into one append + fsync (group commit). When the log gets bigger than
+    the table, it is compacted into the snapshot. At loading, the log is replayed on top of the snapshot.
+
+    If an append fails, the writers of the group get the error and the table is reloaded from the files (on which
+    the writes not yet appended are replayed): memory does not keep writes that are not on disk.
+
+    Appends, compactions and 'clear' are serialized by 'lock': a snapshot never replaces the log while records are
+    appended to it.
+    """
+
+    compaction_min_records = 1000
+
+    def __init__(self, base_path: Path, table_body: TableBody, secondary_indexes: List[SecondaryIndex],
+                 fsync: bool = True):
+
+        self.data_path = base_path / "data.json"
+        self.log_path = base_path / "data.log"
+        self.fsync = fsync
+        self.table_body = table_body
+        self.secondary_indexes = secondary_indexes
+        self.pending: List[JSON] = []
+        self.waiters: List[asyncio.Future] = []
+        self.flushing: Union[asyncio.Future, None] = None
+        self.lock = asyncio.Lock()
+        self._load()
+
+    def _load(self):
+
+        repair_log(self.log_path)
+        snapshot = read_snapshot(self.data_path)
+        self.table = LocalTable(table_body=self.table_body, secondary_indexes=self.secondary_indexes,
+                                documents=snapshot["documents"])
+        records, _ = read_log(self.log_path, snapshot.get("log", None))
+        for record in records + self.pending:
+            self._replay(record)
+        self.log_records = len([r for r in records if r["op"] != "header"])
+        self.signature = self._signature()
+
+    def _signature(self):
+        return file_signature(self.data_path), file_signature(self.log_path)
+
+    def _replay(self, record: JSON):
+        if record["op"] == "upsert":
+            self.table.upsert(record["doc"])
+        if record["op"] == "delete":
+            self.table.delete(record["key"], record["owner"])
+
+    @property
+    def log_header(self):
+        # a new id for each new log: positions in a previous log do not apply to it
+        return {"op": "header", "id": uuid.uuid4().hex, "primary_key": self.table.primary_columns}
+
+    def is_outdated(self) -> bool:
+        """
+        Whether the files have been modified by someone else since the last load/write.
+        """
+        return not self.pending and self.flushing is None and not self.lock.locked() and \
+            self._signature() != self.signature
+
+    async def upsert(self, docs: List[JSON]):
+
+        records = []
+        for doc in docs:
+            key = self.table.upsert(doc)
+            records.append({"op": "upsert", "key": key, "doc": doc})
+        await self._commit(records)
+
+    async def delete(self, keys: List[str], owner: str) -> int:
+
+        records = [{"op": "delete", "key": key, "owner": owner} for key in keys if self.table.delete(key, owner)]
+        if records:
+            await self._commit(records)
+        return len(records)
+
+    async def clear(self):
+
+        async with self.lock:
+            # the writes not yet appended are applied to the table, the clear supersedes them
+            superseded, waiters = self.pending, self.waiters
+            self.pending, self.waiters = [], []
+            self.table.clear()
+            try:
+                await asyncio.get_event_loop().run_in_executor(None, self._write_snapshot, [])
+            except Exception:
+                self.pending, self.waiters = superseded + self.pending, waiters + self.waiters
+                self._load()
+                raise
+            self.log_records = 0
+            self.signature = self._signature()
+        for waiter in waiters:
+            if not waiter.done():
+                waiter.set_result(None)
+
+    async def compact(self):
+
+        async with self.lock:
+            # the writes not yet appended are included in the snapshot, their (idempotent) records are appended
+            # to the new log afterwards
+            await asyncio.get_event_loop().run_in_executor(None, self._write_snapshot, self.table.all_documents())
+            self.log_records = 0
+            self.signature = self._signature()
+
+    async def _commit(self, records: List[JSON]):
+
+        future = asyncio.get_event_loop().create_future()
+        self.pending.extend(records)
+        self.waiters.append(future)
+        if self.flushing is None:
+            self.flushing = asyncio.ensure_future(self._flush())
+        await future
+
+    async def _flush(self):
+
+        loop = asyncio.get_event_loop()
+        try:
+            # let the writes issued in the same loop's iteration join the group
+            await asyncio.sleep(0)
+            while True:
+                async with self.lock:
+                    # picked once the lock is acquired: a 'clear' may have superseded them meanwhile
+                    if not self.pending:
+                        break
+                    records, waiters = self.pending, self.waiters
+                    self.pending, self.waiters = [], []
+                    try:
+                        await loop.run_in_executor(None, self._append, records)
+                    except Exception as e:
+                        log_error(f"Append to {self.log_path} failed, reload the table", str(e))
+                        try:
+                            # in the loop's thread: no write can be applied to the table during the reload
+                            self._load()
+                        except Exception as reload_error:
+                            log_error(f"Reload of {self.data_path} failed", str(reload_error))
+                        for waiter in waiters:
+                            if not waiter.done():
+                                waiter.set_exception(e)
+                        continue
+                    self.log_records += len(records)
+                    for waiter in waiters:
+                        if not waiter.done():
+                            waiter.set_result(None)
+                    if self.log_records > max(self.compaction_min_records, len(self.table)):
+                        try:
+                            await loop.run_in_executor(None, self._write_snapshot, self.table.all_documents())
+                            self.log_records = 0
+                        except Exception as e:
+                            log_error(f"Compaction of {self.data_path} failed", str(e))
+                    self.signature = self._signature()
+        finally:
+            self.flushing = None
+
+    def _append(self, records: List[JSON]):
+
+        empty = not self.log_path.exists() or self.log_path.stat().st_size == 0
+        with open(self.log_path, 'a') as fp:
+            if empty:
+                fp.write(json.dumps(self.log_header) + "\n")
+            fp.write("".join(json.dumps(record) + "\n" for record in records))
+            fp.flush()
+            if self.fsync:
+                os.fsync(fp.fileno())
+
+    def _write_snapshot(self, documents: List[JSON]):
+        """
+        The snapshot is replaced before the log is truncated: a crash in between only leads to the
+        (idempotent) replay of records already included in the snapshot.
+        """
+        write_atomic(self.data_path, json.dumps({"documents": documents}, indent=4), self.fsync)
+        write_atomic(self.log_path, json.dumps(self.log_header) + "\n", self.fsync)
+
+
+stores: Dict[Path, LocalTableStore] = {}
+
+
+def get_local_store(base_path: Path, table_body: TableBody, secondary_indexes: List[SecondaryIndex]) \
+        -> LocalTableStore:
+    """
+    Return the store of the table in 'base_path', the files are loaded again only if they have changed
+    since the last access (e.g. written by another process).
+    """
+    store = stores.get(base_path, None)
+    if store and not store.is_outdated():
+        return store
+
+    store = LocalTableStore(base_path=base_path, table_body=table_body, secondary_indexes=secondary_indexes)
+    stores[base_path] = store
+    return store
@@ -0,0 +1,49 @@
+import asyncio
+import json
+from typing import Union, Callable, Awaitable, AsyncIterator, Any
+
+from fastapi import HTTPException
+
+from youwol_utils.clients.docdb.models import QueryBody
+from youwol_utils.types import JSON
+
+
+def to_iterator(position: Any) -> str:
+    """
+    Iterator of the local clients: the position (in the query's order) of the last document of a page, the next
+    page starts right after it whatever the number of documents before (keyset pagination).
+    """
+    return json.dumps(position)
+
+
+def from_iterator(iterator: str) -> Any:
+    try:
+        return json.loads(iterator)
+    except ValueError:
+        raise HTTPException(status_code=400, detail=f"Invalid query iterator '{iterator}'")
+
+
+async def iter_query(query: Callable[..., Awaitable[JSON]], query_body: Union[QueryBody, str],
+                     owner: Union[str, None], **kwargs) -> AsyncIterator[JSON]:
+    """
+    Yields the documents matching 'query_body' page by page ('max_results' documents per page), following the
+    'iterator' returned with each page. The next page is fetched while the current one is consumed.
+    """
+    if isinstance(query_body, str):
+        query_body = QueryBody.parse(query_body)
+
+    def fetch(iterator: Union[str, None]):
+        return asyncio.ensure_future(query(query_body=query_body.copy(update={"iterator": iterator}), owner=owner,
+                                           **kwargs))
+
+    page = fetch(query_body.iterator)
+    try:
+        while page:
+            resp = await page
+            iterator = resp.get("iterator", None)
+            page = fetch(iterator) if iterator and resp["documents"] else None
+            for doc in resp["documents"]:
+                yield doc
+    finally:
+        if page and not page.done():
+            page.cancel()
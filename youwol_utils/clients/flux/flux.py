@@ -1,7 +1,7 @@
 from typing import Dict
-import aiohttp
 from dataclasses import dataclass, field
 
+from youwol_utils.clients.http_sessions import pooled_session
 from youwol_utils.clients.utils import raise_exception_from_response
 
 
@@ -11,12 +11,11 @@ class FluxClient:
     url_base: str
 
     headers: Dict[str, str] = field(default_factory=lambda: {})
-    connector = aiohttp.TCPConnector(verify_ssl=False)
 
     async def get_projects(self, **kwargs):
 
         url = f"{self.url_base}/projects"
-        async with aiohttp.ClientSession(headers=self.headers) as session:
+        async with pooled_session(self.url_base, self.headers) as session:
             async with await session.get(url=url, **kwargs) as resp:
                 if resp.status == 200:
                     resp = await resp.json()
@@ -27,7 +26,7 @@ class FluxClient:
     async def create_project(self, body, **kwargs):
 
         url = f"{self.url_base}/projects/create"
-        async with aiohttp.ClientSession(headers=self.headers) as session:
+        async with pooled_session(self.url_base, self.headers) as session:
             async with await session.post(url=url, json=body, **kwargs) as resp:
                 if resp.status == 200:
                     resp = await resp.json()
@@ -38,7 +37,7 @@ class FluxClient:
     async def update_project(self, project_id, body, **kwargs):
 
         url = f"{self.url_base}/projects/{project_id}"
-        async with aiohttp.ClientSession(headers=self.headers) as session:
+        async with pooled_session(self.url_base, self.headers) as session:
             async with await session.post(url=url, json=body, **kwargs) as resp:
                 if resp.status == 200:
                     resp = await resp.json()
@@ -49,7 +48,7 @@ class FluxClient:
     async def get_project(self, project_id: str, **kwargs):
 
         url = f"{self.url_base}/projects/{project_id}"
-        async with aiohttp.ClientSession(headers=self.headers) as session:
+        async with pooled_session(self.url_base, self.headers) as session:
             async with await session.get(url=url, **kwargs) as resp:
                 if resp.status == 200:
                     resp = await resp.json()
@@ -60,7 +59,7 @@ class FluxClient:
     async def delete_project(self, project_id: str, **kwargs):
 
         url = f"{self.url_base}/projects/{project_id}"
-        async with aiohttp.ClientSession(headers=self.headers) as session:
+        async with pooled_session(self.url_base, self.headers) as session:
             async with await session.delete(url=url, **kwargs) as resp:
                 if resp.status == 200:
                     resp = await resp.json()
@@ -71,7 +70,7 @@ class FluxClient:
     async def get_records(self, body, **kwargs):
 
         url = f"{self.url_base}/records"
-        async with aiohttp.ClientSession(headers=self.headers) as session:
+        async with pooled_session(self.url_base, self.headers) as session:
             async with await session.post(url=url, json=body, **kwargs) as resp:
                 if resp.status == 200:
                     resp = await resp.json()
@@ -82,7 +81,7 @@ class FluxClient:
     async def update_metadata(self, project_id: str, body,  **kwargs):
 
         url = f"{self.url_base}/projects/{project_id}/metadata"
-        async with aiohttp.ClientSession(headers=self.headers) as session:
+        async with pooled_session(self.url_base, self.headers) as session:
             async with await session.post(url=url, json=body, **kwargs) as resp:
                 if resp.status == 200:
                     resp = await resp.json()
@@ -93,7 +92,7 @@ class FluxClient:
     async def get_metadata(self, project_id: str, **kwargs):
 
         url = f"{self.url_base}/projects/{project_id}/metadata"
-        async with aiohttp.ClientSession(headers=self.headers) as session:
+        async with pooled_session(self.url_base, self.headers) as session:
             async with await session.get(url=url, **kwargs) as resp:
                 if resp.status == 200:
                     resp = await resp.json()
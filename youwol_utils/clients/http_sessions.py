@@ -0,0 +1,178 @@
+import asyncio
+import copy
+from typing import Dict, Mapping, Union, Tuple, Callable, Awaitable, Any, Hashable
+
+import aiohttp
+from dataclasses import dataclass, field
+
+
+@dataclass(frozen=True)
+class SessionsConfig:
+
+    limit: int = 100
+    limit_per_host: int = 20
+    ttl_dns_cache: int = 300
+    keepalive_timeout: float = 30
+    verify_ssl: bool = True
+    # url bases for which the TLS certificates are not verified
+    no_verify_ssl: Tuple[str, ...] = ()
+    coalesce_gets: bool = False
+
+
+class HttpSessions:
+    """
+    Process wide store of keep-alive aiohttp sessions, one per 'url_base'.
+
+    The clients of youwol_utils used to open a new session (and TCP/TLS handshake) for each call,
+    they now all go through this store. Sessions are lazily created within the running event loop,
+    'startup' and 'shutdown' are meant to be registered as application's lifecycle hooks.
+
+    TLS certificates are verified unless disabled by the configuration or by the caller ('verify_ssl'), sessions
+    do not store cookies: they are shared by the requests of all the users.
+    """
+
+    config: SessionsConfig = SessionsConfig()
+    sessions: Dict[Tuple[str, bool], Tuple[asyncio.AbstractEventLoop, aiohttp.ClientSession]] = {}
+
+    @staticmethod
+    async def startup(config: SessionsConfig = None):
+        if config:
+            HttpSessions.config = config
+
+    @staticmethod
+    async def shutdown():
+        loop = asyncio.get_event_loop()
+        sessions = [session for session_loop, session in HttpSessions.sessions.values() if session_loop == loop]
+        HttpSessions.sessions.clear()
+        await asyncio.gather(*[session.close() for session in sessions if not session.closed])
+
+    @staticmethod
+    def get(url_base: str, verify_ssl: bool = True) -> aiohttp.ClientSession:
+
+        config = HttpSessions.config
+        verify_ssl = verify_ssl and config.verify_ssl and url_base not in config.no_verify_ssl
+        loop = asyncio.get_event_loop()
+        session_loop, session = HttpSessions.sessions.get((url_base, verify_ssl), (None, None))
+        # a session is bound to the event loop it has been created in
+        if session_loop == loop and not session.closed:
+            return session
+        if session:
+            HttpSessions.retire(session_loop, session)
+
+        connector = aiohttp.TCPConnector(
+            limit=config.limit,
+            limit_per_host=config.limit_per_host,
+            ttl_dns_cache=config.ttl_dns_cache,
+            keepalive_timeout=config.keepalive_timeout,
+            ssl=None if verify_ssl else False
+            )
+        session = aiohttp.ClientSession(connector=connector, cookie_jar=aiohttp.DummyCookieJar())
+        HttpSessions.sessions[(url_base, verify_ssl)] = (loop, session)
+        return session
+
+    @staticmethod
+    def retire(session_loop: asyncio.AbstractEventLoop, session: aiohttp.ClientSession):
+        """
+        Close a replaced session in its own event loop; if this loop is not running anymore its connections can
+        not be closed gracefully and are released with it.
+        """
+        if session.closed or session_loop.is_closed():
+            return
+        if session_loop == asyncio.get_event_loop():
+            asyncio.ensure_future(session.close())
+        elif session_loop.is_running():
+            asyncio.run_coroutine_threadsafe(session.close(), session_loop)
+
+
+@dataclass(frozen=True)
+class PooledSession:
+    """
+    Drop-in for 'aiohttp.ClientSession(headers=...)' used as async context manager, requests are emitted
+    through the shared session of 'url_base': leaving the context does not close the underlying connections.
+    """
+
+    url_base: str
+    headers: Mapping[str, str] = field(default_factory=lambda: {})
+    verify_ssl: bool = True
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *_args):
+        pass
+
+    def request(self, method: str, url: str, headers: Union[Mapping[str, str], None] = None, **kwargs):
+        session = HttpSessions.get(self.url_base, self.verify_ssl)
+        return session.request(method, url, headers={**self.headers, **(headers or {})}, **kwargs)
+
+    def get(self, url: str, **kwargs):
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url: str, **kwargs):
+        return self.request("POST", url, **kwargs)
+
+    def put(self, url: str, **kwargs):
+        return self.request("PUT", url, **kwargs)
+
+    def delete(self, url: str, **kwargs):
+        return self.request("DELETE", url, **kwargs)
+
+
+def pooled_session(url_base: str, headers: Mapping[str, str] = None, verify_ssl: bool = True) -> PooledSession:
+    return PooledSession(url_base=url_base, headers=headers or {}, verify_ssl=verify_ssl)
+
+
+auth_scope_headers = ['authorization', 'user-name', 'cookie']
+
+
+def auth_scope(headers: Union[Mapping[str, str], None]) -> Tuple[Union[str, None], ...]:
+    headers = {k.lower(): v for k, v in (headers or {}).items()}
+    return tuple(headers.get(k, None) for k in auth_scope_headers)
+
+
+class CoalescedGets:
+    """
+    Process wide store of the in-flight GET requests of the clients, enabled by 'SessionsConfig.coalesce_gets'.
+
+    Identical concurrent GETs (same url, params and auth scope, see 'auth_scope_headers') share the result of a
+    single upstream request, 'requests' counts the calls and 'coalesced' the ones that did not reach upstream.
+    Each caller gets its own copy of the result.
+    """
+
+    in_flight: Dict[Hashable, asyncio.Future] = {}
+    requests: int = 0
+    coalesced: int = 0
+
+    @staticmethod
+    def key(url: str, headers: Mapping[str, str] = None, params: Mapping[str, Any] = None) -> Hashable:
+
+        return url, tuple(sorted((k, str(v)) for k, v in (params or {}).items())), auth_scope(headers)
+
+    @staticmethod
+    async def get(key: Hashable, fetch: Callable[[], Awaitable[Any]]) -> Any:
+
+        if not HttpSessions.config.coalesce_gets:
+            return await fetch()
+
+        CoalescedGets.requests += 1
+        future = CoalescedGets.in_flight.get(key, None)
+        if future:
+            CoalescedGets.coalesced += 1
+        else:
+            future = asyncio.ensure_future(fetch())
+            CoalescedGets.in_flight[key] = future
+            future.add_done_callback(lambda done: CoalescedGets.in_flight.get(key, None) is done
+                                     and CoalescedGets.in_flight.pop(key))
+        # a caller being cancelled should not cancel the request shared with the others
+        result = await asyncio.shield(future)
+        # each caller gets its own copy (e.g. of a parsed JSON), bytes & str are immutable
+        return result if isinstance(result, (bytes, str)) else copy.deepcopy(result)
+
+    @staticmethod
+    def stats() -> Dict[str, int]:
+        return {"requests": CoalescedGets.requests, "coalesced": CoalescedGets.coalesced}
+
+
+def coalesced_get(url: str, headers: Mapping[str, str], params: Mapping[str, Any],
+                  fetch: Callable[[], Awaitable[Any]]) -> Awaitable[Any]:
+    return CoalescedGets.get(CoalescedGets.key(url, headers, params), fetch)
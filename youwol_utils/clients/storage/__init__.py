@@ -1,2 +1,4 @@
 from .storage import *
 from .local_storage import *
+from .chunked import *
+from .cached_storage import CachedStorageClient
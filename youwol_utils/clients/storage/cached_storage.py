@@ -0,0 +1,248 @@
+import hashlib
+import json
+import os
+import time
+import uuid
+from collections import OrderedDict
+from pathlib import Path
+from typing import Union, Mapping, NamedTuple, Dict
+
+import aiofiles
+from dataclasses import dataclass, field
+
+from youwol_utils.clients.http_sessions import auth_scope
+from youwol_utils.clients.storage.local_storage import LocalStorageClient, run_io, io_executor
+from youwol_utils.clients.storage.storage import StorageClient, FileData, ObjectData
+from youwol_utils.types import JSON
+
+
+class CacheEntry(NamedTuple):
+
+    scope: str
+    path: str
+    size: int
+    etag: Union[str, None]
+    validated: float
+
+
+def write_entry(data_path: Path, meta_path: Path, data: bytes, entry: CacheEntry):
+
+    tmp_path = data_path.parent / f".{uuid.uuid4().hex}"
+    tmp_path.write_bytes(data)
+    os.replace(tmp_path, data_path)
+    tmp_path.write_text(json.dumps(entry._asdict()))
+    os.replace(tmp_path, meta_path)
+
+
+def remove_entry(data_path: Path, meta_path: Path):
+
+    for path in [meta_path, data_path]:
+        if path.exists():
+            os.remove(path)
+
+
+def load_entries(cache_dir: Path) -> Dict[str, CacheEntry]:
+    """
+    Entries found in 'cache_dir' from the least to the most recently used, incomplete ones are removed.
+    """
+    os.makedirs(cache_dir, exist_ok=True)
+    entries = []
+    for meta_path in cache_dir.glob("*.json"):
+        data_path = meta_path.with_suffix("")
+        try:
+            entry = CacheEntry(**json.loads(meta_path.read_text()))
+            entries.append((data_path.stat().st_mtime, data_path.name, entry))
+        except (OSError, ValueError, TypeError):
+            remove_entry(data_path, meta_path)
+    for tmp_path in cache_dir.glob(".*"):
+        os.remove(tmp_path)
+    return OrderedDict((key, entry) for _, key, entry in sorted(entries, key=lambda e: e[0]))
+
+
+@dataclass(frozen=False)
+class CachedStorageClient:
+    """
+    Caches the objects read by 'get_bytes' ('get_json', 'get_text') of 'storage' in 'cache_dir', keyed by
+    bucket/owner/path. An object is served from disk for 'max_age' seconds, then revalidated with its etag (a
+    conditional request that does not transfer the content if unchanged). Least recently used objects are evicted
+    when the cache exceeds 'max_size' bytes. Other methods are forwarded to 'storage'.
+
+    Writes through this client ('post_*', 'delete', 'delete_group') invalidate the cached objects they target;
+    writes made by other means are seen after at most 'max_age'.
+    """
+
+    storage: Union[StorageClient, LocalStorageClient]
+    cache_dir: Path
+    max_size: int = 1024 ** 3
+    max_age: float = 60
+
+    hits: int = field(init=False, default=0)
+    revalidations: int = field(init=False, default=0)
+    misses: int = field(init=False, default=0)
+    # key => entry, from the least to the most recently used
+    entries: Dict[str, CacheEntry] = field(init=False, default=None)
+    size: int = field(init=False, default=0)
+    # count of invalidations, an object read while an invalidation happened is not cached
+    invalidations: int = field(init=False, default=0)
+
+    def __post_init__(self):
+        self.cache_dir = Path(self.cache_dir)
+        self.entries = load_entries(self.cache_dir)
+        self.size = sum(entry.size for entry in self.entries.values())
+
+    def __getattr__(self, name: str):
+        if name == "storage":
+            raise AttributeError(name)
+        return getattr(self.storage, name)
+
+    @property
+    def stats(self) -> JSON:
+        total = self.hits + self.revalidations + self.misses
+        return {"hits": self.hits, "revalidations": self.revalidations, "misses": self.misses,
+                "hit_rate": (self.hits + self.revalidations) / total if total else 0,
+                "count": len(self.entries), "size": self.size}
+
+    async def get_bytes(self, path: Union[str, Path], owner: Union[str, None], **kwargs) -> bytes:
+
+        scope = self._owner_scope(owner, kwargs.get('headers', None))
+        key = self._key(scope, path)
+        invalidations = self.invalidations
+        entry = self.entries.get(key, None)
+        if entry and time.time() - entry.validated < self.max_age:
+            data = await self._read(key)
+            if data is not None:
+                self.hits += 1
+                return data
+            entry = None
+
+        data, etag = await self.storage.get_bytes_if_modified(path, owner, etag=entry.etag if entry else None,
+                                                              **kwargs)
+        if data is None:
+            data = await self._read(key)
+            if data is not None:
+                self.revalidations += 1
+                await self._store(key, entry._replace(validated=time.time()))
+                return data
+            data, etag = await self.storage.get_bytes_if_modified(path, owner, etag=None, **kwargs)
+
+        self.misses += 1
+        if self.invalidations == invalidations and len(data) <= self.max_size:
+            await self._store(key, CacheEntry(scope=scope, path=str(path), size=len(data), etag=etag,
+                                              validated=time.time()), data)
+        return data
+
+    async def get_json(self, path: Union[str, Path], owner: Union[str, None], **kwargs):
+
+        content = await self.get_bytes(path, owner, **kwargs)
+        return json.loads(content.decode("utf-8"))
+
+    async def get_text(self, path: Union[str, Path], owner: Union[str, None], **kwargs):
+
+        content = await self.get_bytes(path, owner, **kwargs)
+        return content.decode("utf-8")
+
+    async def post_file(self, form: FileData, **kwargs):
+
+        try:
+            return await self.storage.post_file(form, **kwargs)
+        finally:
+            await self._invalidate(form.objectName, form.owner, kwargs.get('headers', None))
+
+    async def post_object(self, path: Union[str, Path], content: Union[str, ObjectData], content_type: str,
+                          owner: Union[str, None], **kwargs):
+
+        try:
+            return await self.storage.post_object(path, content=content, content_type=content_type, owner=owner,
+                                                  **kwargs)
+        finally:
+            await self._invalidate(path, owner, kwargs.get('headers', None))
+
+    async def post_json(self, path: Union[str, Path], json: JSON, owner: Union[str, None], **kwargs):
+
+        try:
+            return await self.storage.post_json(path, json=json, owner=owner, **kwargs)
+        finally:
+            await self._invalidate(path, owner, kwargs.get('headers', None))
+
+    async def post_text(self, path: Union[str, Path], text: str, owner: Union[str, None], **kwargs):
+
+        try:
+            return await self.storage.post_text(path, text=text, owner=owner, **kwargs)
+        finally:
+            await self._invalidate(path, owner, kwargs.get('headers', None))
+
+    async def delete(self, path: Union[str, Path], owner: Union[str, None], **kwargs):
+
+        try:
+            return await self.storage.delete(path, owner, **kwargs)
+        finally:
+            await self._invalidate(path, owner, kwargs.get('headers', None), prefix=True)
+
+    async def delete_group(self, prefix: Union[str, Path], owner: Union[str, None], **kwargs):
+
+        try:
+            return await self.storage.delete_group(prefix, owner, **kwargs)
+        finally:
+            await self._invalidate(prefix, owner, kwargs.get('headers', None), prefix=True)
+
+    async def clear(self):
+
+        for key in list(self.entries.keys()):
+            await self._remove(key)
+
+    async def _read(self, key: str) -> Union[bytes, None]:
+
+        try:
+            async with aiofiles.open(self.cache_dir / key, 'rb', executor=io_executor) as fp:
+                data = await fp.read()
+        except FileNotFoundError:
+            await self._remove(key)
+            return None
+        if key in self.entries:
+            self.entries.move_to_end(key)
+            await run_io(os.utime, self.cache_dir / key)
+        return data
+
+    async def _store(self, key: str, entry: CacheEntry, data: bytes = None):
+
+        if data is not None:
+            await run_io(write_entry, self.cache_dir / key, self.cache_dir / f"{key}.json", data, entry)
+        else:
+            await run_io((self.cache_dir / f"{key}.json").write_text, json.dumps(entry._asdict()))
+        previous = self.entries.pop(key, None)
+        self.size += entry.size - (previous.size if previous else 0)
+        self.entries[key] = entry
+
+        while self.size > self.max_size:
+            await self._remove(next(iter(self.entries.keys())))
+
+    async def _remove(self, key: str):
+
+        entry = self.entries.pop(key, None)
+        if entry:
+            self.size -= entry.size
+        await run_io(remove_entry, self.cache_dir / key, self.cache_dir / f"{key}.json")
+
+    async def _invalidate(self, path: Union[str, Path], owner: Union[str, None], headers: Mapping[str, str],
+                          prefix: bool = False):
+
+        self.invalidations += 1
+        scope = self._owner_scope(owner, headers)
+        key = self._key(scope, path)
+        if not prefix:
+            if key in self.entries:
+                await self._remove(key)
+            return
+
+        path = str(path).rstrip('/')
+        for key, entry in list(self.entries.items()):
+            if entry.scope == scope and (entry.path == path or entry.path.startswith(f"{path}/")):
+                await self._remove(key)
+
+    def _key(self, scope: str, path: Union[str, Path]) -> str:
+        return hashlib.sha256(f"{scope}/{path}".encode()).hexdigest()
+
+    def _owner_scope(self, owner: Union[str, None], headers: Mapping[str, str]) -> str:
+        # without owner, the owner is determined by the storage service from the headers
+        owner = owner if owner else json.dumps(auth_scope(headers))
+        return f"{self.storage.bucket_name}:{owner}"
@@ -0,0 +1,228 @@
+import asyncio
+import hashlib
+import os
+import uuid
+from pathlib import Path
+from typing import Union, Callable, Awaitable, Any, AsyncIterator, List
+
+import aiofiles
+import aiohttp
+from dataclasses import dataclass
+from fastapi import HTTPException
+
+from youwol_utils.clients.storage.local_storage import LocalStorageClient
+from youwol_utils.clients.storage.storage import StorageClient, FileData, ObjectData
+from youwol_utils.clients.utils import log_info, log_error
+from youwol_utils.types import JSON
+
+
+async def iter_parts(content: ObjectData, part_size: int) -> AsyncIterator[bytes]:
+    """
+    Yields 'content' by parts of 'part_size' bytes (the last one can be smaller), reading it as it goes.
+    """
+    if isinstance(content, bytes):
+        for i in range(0, len(content), part_size):
+            yield content[i:i + part_size]
+        return
+
+    if isinstance(content, Path):
+        async with aiofiles.open(content, 'rb') as fp:
+            while True:
+                part = await fp.read(part_size)
+                if not part:
+                    return
+                yield part
+
+    buffer = b""
+    async for chunk in content:
+        buffer += chunk
+        while len(buffer) >= part_size:
+            yield buffer[0:part_size]
+            buffer = buffer[part_size:]
+    if buffer:
+        yield buffer
+
+
+def is_transient(error: Exception) -> bool:
+    if isinstance(error, HTTPException):
+        return error.status_code >= 500
+    return isinstance(error, (aiohttp.ClientError, asyncio.TimeoutError))
+
+
+@dataclass(frozen=True)
+class ChunkedStorage:
+    """
+    Large objects stored as parts of 'part_size' bytes, uploaded and downloaded with 'concurrency' parallel
+    requests through 'storage'; a part failing with a transient error is retried up to 'retries' times.
+
+    The object at 'path' is made of:
+        *  the parts, '{path}.parts/{upload id}/{index}'
+        *  the manifest, '{path}.manifest.json', written once all the parts are uploaded (commit): readers only see
+        complete uploads, the parts of the previous upload are then removed.
+
+    Parts are addressed by offset, 'get_range' only fetches the parts covering the requested range. If an upload
+    fails, the parts already written are deleted.
+
+    It only relies on 'post_file', 'post_json', 'get_bytes', 'get_json', 'delete' & 'delete_group' of 'storage': it
+    can be exercised without the storage service with a 'LocalStorageClient', or with a 'StorageClient' targeting a
+    stand-in server implementing the routes 'file' (POST), 'object' (GET, POST, DELETE) and 'objects' (DELETE).
+    """
+
+    storage: Union[StorageClient, LocalStorageClient]
+    part_size: int = 8 * 1024 * 1024
+    concurrency: int = 4
+    retries: int = 3
+    retry_delay: float = 0.5
+
+    @staticmethod
+    def manifest_path(path: Union[str, Path]) -> str:
+        return f"{path}.manifest.json"
+
+    @staticmethod
+    def parts_prefix(path: Union[str, Path]) -> str:
+        return f"{path}.parts"
+
+    async def post_object(self, path: Union[str, Path], content: ObjectData, content_type: str,
+                          owner: Union[str, None], **kwargs) -> JSON:
+
+        upload_id = uuid.uuid4().hex
+        semaphore = asyncio.Semaphore(self.concurrency)
+        parts: List[JSON] = []
+        uploads = []
+
+        async def upload(index: int, data: bytes):
+            try:
+                name = f"{self.parts_prefix(path)}/{upload_id}/{index:06d}"
+                form = FileData(objectName=name, objectData=data, objectSize=len(data),
+                                content_type="application/octet-stream", content_encoding="", owner=owner)
+                await self._with_retries(lambda: self.storage.post_file(form, **kwargs))
+            finally:
+                semaphore.release()
+
+        try:
+            offset = 0
+            async for data in iter_parts(content, self.part_size):
+                # at most 'concurrency' parts are in memory
+                await semaphore.acquire()
+                parts.append({"index": len(parts), "offset": offset, "size": len(data),
+                              "md5": hashlib.md5(data).hexdigest()})
+                uploads.append(asyncio.ensure_future(upload(len(parts) - 1, data)))
+                offset += len(data)
+            await asyncio.gather(*uploads)
+
+            previous = await self.get_manifest(path, owner, **kwargs)
+            manifest = {"uploadId": upload_id, "size": offset, "partSize": self.part_size,
+                        "contentType": content_type, "parts": parts}
+            await self.storage.post_json(self.manifest_path(path), json=manifest, owner=owner, **kwargs)
+        except BaseException:
+            for task in uploads:
+                task.cancel()
+            await asyncio.gather(*uploads, return_exceptions=True)
+            await self._delete_upload(path, upload_id, owner, **kwargs)
+            raise
+
+        if previous:
+            await self._delete_parts(path, previous, owner, **kwargs)
+        return manifest
+
+    async def get_manifest(self, path: Union[str, Path], owner: Union[str, None], **kwargs) -> Union[JSON, None]:
+
+        try:
+            return await self.storage.get_json(self.manifest_path(path), owner, **kwargs)
+        except HTTPException as e:
+            if e.status_code == 404:
+                return None
+            raise e
+
+    async def stream_bytes(self, path: Union[str, Path], owner: Union[str, None], start: int = 0,
+                           end: Union[int, None] = None, **kwargs) -> AsyncIterator[bytes]:
+        """
+        Yields the bytes [start, end[ of the object, the next 'concurrency' parts are fetched in advance.
+        """
+        manifest = await self.get_manifest(path, owner, **kwargs)
+        if manifest is None:
+            raise HTTPException(status_code=404, detail=f"No chunked object at '{path}'")
+
+        end = manifest["size"] if end is None else min(end, manifest["size"])
+        parts = [p for p in manifest["parts"] if p["offset"] < end and p["offset"] + p["size"] > start]
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def download(part: JSON) -> bytes:
+            async with semaphore:
+                return await self._with_retries(lambda: self._get_part(path, manifest, part, owner, **kwargs))
+
+        tasks = [asyncio.ensure_future(download(part)) for part in parts[0:self.concurrency]]
+        try:
+            for i, part in enumerate(parts):
+                data = await tasks[i]
+                tasks[i] = None
+                if i + self.concurrency < len(parts):
+                    tasks.append(asyncio.ensure_future(download(parts[i + self.concurrency])))
+                yield data[max(start - part["offset"], 0):end - part["offset"]]
+        finally:
+            for task in tasks:
+                if task:
+                    task.cancel()
+
+    async def get_bytes(self, path: Union[str, Path], owner: Union[str, None], **kwargs) -> bytes:
+        return b"".join([data async for data in self.stream_bytes(path, owner, **kwargs)])
+
+    async def get_range(self, path: Union[str, Path], owner: Union[str, None], start: int, end: int,
+                        **kwargs) -> bytes:
+        return b"".join([data async for data in self.stream_bytes(path, owner, start=start, end=end, **kwargs)])
+
+    async def download_to(self, path: Union[str, Path], owner: Union[str, None], target: Union[str, Path],
+                          **kwargs) -> int:
+
+        target = Path(target)
+        tmp_path = target.parent / f".{target.name}.{uuid.uuid4().hex}"
+        size = 0
+        try:
+            async with aiofiles.open(tmp_path, 'wb') as fp:
+                async for data in self.stream_bytes(path, owner, **kwargs):
+                    await fp.write(data)
+                    size += len(data)
+            os.replace(tmp_path, target)
+        except BaseException:
+            if tmp_path.exists():
+                os.remove(tmp_path)
+            raise
+        return size
+
+    async def delete(self, path: Union[str, Path], owner: Union[str, None], **kwargs):
+
+        manifest = await self.get_manifest(path, owner, **kwargs)
+        if manifest is None:
+            return
+        await self.storage.delete(self.manifest_path(path), owner, **kwargs)
+        await self._delete_parts(path, manifest, owner, **kwargs)
+
+    async def _get_part(self, path: Union[str, Path], manifest: JSON, part: JSON, owner: Union[str, None],
+                        **kwargs) -> bytes:
+
+        name = f"{self.parts_prefix(path)}/{manifest['uploadId']}/{part['index']:06d}"
+        data = await self.storage.get_bytes(name, owner, **kwargs)
+        if len(data) != part["size"] or hashlib.md5(data).hexdigest() != part["md5"]:
+            raise HTTPException(status_code=502, detail=f"Part {part['index']} of '{path}' is corrupted")
+        return data
+
+    async def _delete_parts(self, path: Union[str, Path], manifest: JSON, owner: Union[str, None], **kwargs):
+        await self.storage.delete_group(f"{self.parts_prefix(path)}/{manifest['uploadId']}", owner, **kwargs)
+
+    async def _delete_upload(self, path: Union[str, Path], upload_id: str, owner: Union[str, None], **kwargs):
+        # best effort: the error of the upload is the one reported
+        try:
+            await self.storage.delete_group(f"{self.parts_prefix(path)}/{upload_id}", owner, **kwargs)
+        except Exception as e:
+            log_error(f"Can not delete the parts of the failed upload {upload_id} of '{path}'", str(e))
+
+    async def _with_retries(self, fct: Callable[[], Awaitable[Any]]) -> Any:
+
+        for attempt in range(self.retries + 1):
+            try:
+                return await fct()
+            except Exception as e:
+                if attempt == self.retries or not is_transient(e):
+                    raise e
+                log_info(f"Transient error on a part, retry {attempt + 1}/{self.retries}", error=str(e))
+                await asyncio.sleep(self.retry_delay * 2 ** attempt)
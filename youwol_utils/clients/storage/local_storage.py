@@ -1,25 +1,55 @@
+import asyncio
+import functools
 import itertools
 import json as _json
 import os
 import shutil
+import uuid
+from concurrent.futures import ThreadPoolExecutor
 from os import PathLike
 from pathlib import Path
-from typing import Union, cast, Mapping
+from typing import Union, cast, Mapping, Callable, Any, AsyncIterator, Tuple
 
+import aiofiles
 from dataclasses import dataclass
 from fastapi import HTTPException
 
 from youwol_utils.clients.utils import get_default_owner
-from youwol_utils.clients.storage import FileData
+from youwol_utils.clients.storage import FileData, ObjectData
 from youwol_utils.types import JSON
 
 flatten = itertools.chain.from_iterable
 
 
+# the blocking file system operations are run in this pool, not in the event loop
+io_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix="local-storage")
+
+
+async def run_io(fct: Callable[..., Any], *args):
+    return await asyncio.get_event_loop().run_in_executor(io_executor, functools.partial(fct, *args))
+
+
 def create_dir_if_needed(full_path: Path):
     dir_path = full_path.parent
     if not dir_path.exists():
-        os.makedirs(cast(PathLike, dir_path))
+        os.makedirs(cast(PathLike, dir_path), exist_ok=True)
+
+
+def remove(full_path: Path):
+    if full_path.is_dir():
+        shutil.rmtree(full_path)
+        return
+    os.remove(full_path)
+
+
+def file_etag(full_path: Path) -> str:
+    stat = os.stat(full_path)
+    return f'"{stat.st_mtime_ns:x}-{stat.st_size:x}"'
+
+
+def walk_files(root: Path, relative_to: Path):
+    return list(flatten([[(Path(folder) / f).relative_to(relative_to) for f in files]
+                         for folder, _, files in os.walk(root)]))
 
 
 @dataclass(frozen=True)
@@ -32,16 +62,44 @@ class LocalStorageClient:
     def bucket_path(self) -> Path:
         return self.root_path / self.bucket_name
 
+    @property
+    def tmp_path(self) -> Path:
+        return self.bucket_path / ".tmp"
+
     def get_full_path(self, owner: str, path: Union[str, Path]) -> Path:
         return self.bucket_path / owner[1:] / path
 
+    async def write(self, full_path: Path, data: ObjectData):
+        """
+        Write in a temporary file first, moved to 'full_path' once complete: readers never see a partial file.
+        A path is copied, an async iterator is written chunk by chunk.
+        """
+        tmp_path = self.tmp_path / uuid.uuid4().hex
+        await run_io(create_dir_if_needed, tmp_path)
+        await run_io(create_dir_if_needed, full_path)
+        try:
+            if isinstance(data, Path):
+                await run_io(shutil.copyfile, data, tmp_path)
+            else:
+                async with aiofiles.open(tmp_path, 'wb', executor=io_executor) as fp:
+                    if isinstance(data, bytes):
+                        await fp.write(data)
+                    else:
+                        async for chunk in data:
+                            await fp.write(chunk)
+            await run_io(os.replace, tmp_path, full_path)
+        except Exception:
+            if tmp_path.exists():
+                await run_io(os.remove, tmp_path)
+            raise
+
     async def delete_bucket(self, **_kwargs):
         if self.bucket_path.exists():
-            shutil.rmtree(self.bucket_path)
+            await run_io(shutil.rmtree, self.bucket_path)
 
     async def ensure_bucket(self, **_kwargs):
         if not self.bucket_path.exists():
-            os.makedirs(cast(PathLike, self.bucket_path))
+            await run_io(functools.partial(os.makedirs, cast(PathLike, self.bucket_path), exist_ok=True))
 
         return True
 
@@ -54,13 +112,11 @@ class LocalStorageClient:
             owner = get_default_owner(headers)
 
         full_path = self.get_full_path(owner, form.objectName)
-
-        create_dir_if_needed(full_path)
-        full_path.open('wb').write(form.objectData)
+        await self.write(full_path, form.objectData)
         return {}
 
-    async def post_object(self, path: Union[Path, str], content: bytes, content_type: str,  owner: Union[str, None],
-                          headers: Mapping[str, str] = None, **_kwargs):
+    async def post_object(self, path: Union[Path, str], content: Union[str, ObjectData], content_type: str,
+                          owner: Union[str, None], headers: Mapping[str, str] = None, **_kwargs):
 
         if not headers:
             headers = {}
@@ -70,11 +126,8 @@ class LocalStorageClient:
         if isinstance(content, str):
             content = str.encode(content)
 
-        data = content
-
         full_path = self.get_full_path(owner, path)
-        create_dir_if_needed(full_path)
-        full_path.open('wb').write(data)
+        await self.write(full_path, content)
 
     async def post_json(self, path: Union[str, Path], json: JSON, owner: Union[str, None],
                         headers: Mapping[str, str] = None, **_kwargs):
@@ -85,8 +138,7 @@ class LocalStorageClient:
             owner = get_default_owner(headers)
 
         full_path = self.get_full_path(owner, path)
-        create_dir_if_needed(full_path)
-        full_path.open('w').write(_json.dumps(json, indent=4))
+        await self.write(full_path, _json.dumps(json, indent=4).encode())
         return {}
 
     async def post_text(self, path: Union[str, Path], text, owner: Union[str, None], headers: Mapping[str, str] = None,
@@ -98,8 +150,7 @@ class LocalStorageClient:
             owner = get_default_owner(headers)
 
         full_path = self.get_full_path(owner, path)
-        create_dir_if_needed(full_path)
-        full_path.open('w').write(text)
+        await self.write(full_path, text.encode())
         return {}
 
     async def delete_group(self, prefix: Union[Path, str], owner: Union[str, None], headers: Mapping[str, str] = None,
@@ -112,7 +163,7 @@ class LocalStorageClient:
 
         path = self.get_full_path(owner, prefix)
         if path.exists():
-            shutil.rmtree(path)
+            await run_io(shutil.rmtree, path)
 
     async def delete(self, path: Union[str, Path],  owner: Union[str, None], headers: Mapping[str, str] = None,
                      **_kwargs):
@@ -123,12 +174,9 @@ class LocalStorageClient:
             owner = get_default_owner(headers)
 
         full_path = self.get_full_path(owner, path)
-        if full_path.is_dir():
-            shutil.rmtree(full_path)
-            return
-
-        os.remove(full_path)
-        return {}
+        is_dir = full_path.is_dir()
+        await run_io(remove, full_path)
+        return None if is_dir else {}
 
     async def list_files(self, prefix: Union[str, Path], owner: Union[str, None], headers: Mapping[str, str] = None,
                          **_kwargs):
@@ -139,10 +187,9 @@ class LocalStorageClient:
             owner = get_default_owner(headers)
 
         owner = owner[1:]
-        results = [[(Path(root) / f).relative_to(self.bucket_path / owner) for f in files]
-                   for root, _, files in os.walk(self.bucket_path / owner / prefix)]
+        results = await run_io(walk_files, self.bucket_path / owner / prefix, self.bucket_path / owner)
 
-        return [{"name": str(r)} for r in flatten(results)]
+        return [{"name": str(r)} for r in results]
 
     async def get_bytes(self, path: Union[str, Path], owner: Union[str, None], headers: Mapping[str, str] = None,
                         **_kwargs):
@@ -153,10 +200,64 @@ class LocalStorageClient:
             owner = get_default_owner(headers)
 
         full_path = self.get_full_path(owner, path)
-        if not full_path.is_file():
+        if not await run_io(full_path.is_file):
+            raise HTTPException(status_code=404, detail="File not found")
+
+        async with aiofiles.open(full_path, 'rb', executor=io_executor) as fp:
+            return await fp.read()
+
+    async def get_bytes_if_modified(self, path: Union[str, Path], owner: Union[str, None], etag: Union[str, None],
+                                    headers: Mapping[str, str] = None, **_kwargs) -> Tuple[Union[bytes, None], str]:
+
+        if not headers:
+            headers = {}
+        if not owner:
+            owner = get_default_owner(headers)
+
+        full_path = self.get_full_path(owner, path)
+        if not await run_io(full_path.is_file):
+            raise HTTPException(status_code=404, detail="File not found")
+
+        # files are replaced, not modified in place: mtime & size identify the content
+        current = await run_io(file_etag, full_path)
+        if current == etag:
+            return None, etag
+        async with aiofiles.open(full_path, 'rb', executor=io_executor) as fp:
+            return await fp.read(), current
+
+    async def stream_bytes(self, path: Union[str, Path], owner: Union[str, None], headers: Mapping[str, str] = None,
+                           chunk_size: int = 2**16, **_kwargs) -> AsyncIterator[bytes]:
+
+        if not headers:
+            headers = {}
+        if not owner:
+            owner = get_default_owner(headers)
+
+        full_path = self.get_full_path(owner, path)
+        if not await run_io(full_path.is_file):
+            raise HTTPException(status_code=404, detail="File not found")
+
+        async with aiofiles.open(full_path, 'rb', executor=io_executor) as fp:
+            while True:
+                chunk = await fp.read(chunk_size)
+                if not chunk:
+                    return
+                yield chunk
+
+    async def download_to(self, path: Union[str, Path], owner: Union[str, None], target: Union[str, Path],
+                          headers: Mapping[str, str] = None, **_kwargs) -> int:
+
+        if not headers:
+            headers = {}
+        if not owner:
+            owner = get_default_owner(headers)
+
+        full_path = self.get_full_path(owner, path)
+        if not await run_io(full_path.is_file):
             raise HTTPException(status_code=404, detail="File not found")
 
-        return full_path.open('rb').read()
+        await run_io(shutil.copyfile, full_path, target)
+        return (await run_io(os.stat, target)).st_size
 
     async def get_json(self, path: Union[str, Path], owner: Union[str, None], headers: Mapping[str, str] = None,
                        **kwargs):
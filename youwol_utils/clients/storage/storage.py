@@ -1,20 +1,30 @@
 import base64
+import binascii
+import os
+import uuid
 from pathlib import Path
-from typing import NamedTuple, Dict, Union
-import aiohttp
+from contextlib import contextmanager
+from typing import NamedTuple, Dict, Union, AsyncIterator, AsyncIterable, Tuple
 import json as _json
+
+import aiofiles
 from aiohttp import FormData
 from dataclasses import dataclass, field
 
+from youwol_utils.clients.http_sessions import pooled_session
 from youwol_utils.clients.storage.patches import patch_files_name
 from youwol_utils.clients.utils import raise_exception_from_response
 from youwol_utils.types import JSON
 
 
+ObjectData = Union[bytes, Path, AsyncIterable[bytes]]
+
+
 class FileData(NamedTuple):
 
     objectName: Union[str, Path]
-    objectData: bytes
+    # a path or an async iterator are streamed, not loaded in memory
+    objectData: ObjectData
     objectSize: int
     content_type: str
     content_encoding: str
@@ -25,6 +35,51 @@ def post_drive_body(name: str):
     return {"name": name, "region": "NoCloudProvider"}
 
 
+def object_size(data: Union[str, ObjectData]) -> int:
+
+    if isinstance(data, (str, bytes)):
+        return len(data)
+    if isinstance(data, Path):
+        return data.stat().st_size
+    raise ValueError("The size of the object is required when its data is provided by an async iterator")
+
+
+@contextmanager
+def opened_object_data(data: ObjectData):
+    """
+    File object of 'data' if it is a path (aiohttp streams it from disk), 'data' otherwise.
+    """
+    if not isinstance(data, Path):
+        yield data
+        return
+    with open(data, 'rb') as fp:
+        yield fp
+
+
+base64_alphabet = b"ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789+/="
+base64_ignored = bytes(b for b in range(256) if b not in base64_alphabet)
+
+
+class Base64StreamDecoder:
+    """
+    Decodes a base64 content received by chunks: characters outside the alphabet are ignored (as with
+    'base64.decodebytes'), the characters not forming a complete quantum yet are kept for the next chunk.
+    """
+
+    def __init__(self):
+        self.remaining = b""
+
+    def decode(self, chunk: bytes) -> bytes:
+        data = self.remaining + chunk.translate(None, base64_ignored)
+        end = len(data) - len(data) % 4
+        self.remaining = data[end:]
+        return binascii.a2b_base64(data[0:end])
+
+    def flush(self) -> bytes:
+        data, self.remaining = self.remaining, b""
+        return binascii.a2b_base64(data) if data else b""
+
+
 @dataclass(frozen=True)
 class StorageClient:
 
@@ -35,7 +90,6 @@ class StorageClient:
     version: str = "v0-alpha1"
 
     headers: Dict[str, str] = field(default_factory=lambda: {})
-    connector = aiohttp.TCPConnector(verify_ssl=False)
 
     @property
     def create_bucket_url(self):
@@ -76,7 +130,7 @@ class StorageClient:
             return
 
         url = self.delete_bucket_url + "?forceNotEmpty=true" if force_not_empty else self.delete_bucket_url
-        async with aiohttp.ClientSession(headers=self.headers) as session:
+        async with pooled_session(self.url_base, self.headers) as session:
             async with await session.delete(url=url, **kwargs) as resp:
                 if resp.status == 200:
                     print("Bucket deleted", self.bucket_name)
@@ -85,7 +139,7 @@ class StorageClient:
 
     async def list_buckets(self, **kwargs):
 
-        async with aiohttp.ClientSession(headers=self.headers) as session:
+        async with pooled_session(self.url_base, self.headers) as session:
             async with await session.get(url=self.list_buckets_url, **kwargs) as resp:
                 if resp.status == 200:
                     return await resp.json()
@@ -98,7 +152,7 @@ class StorageClient:
             print(f"bucket {self.bucket_name} exists")
             return True
         body = post_drive_body(self.bucket_name)
-        async with aiohttp.ClientSession(headers=self.headers) as session:
+        async with pooled_session(self.url_base, self.headers) as session:
             async with await session.post(url=self.create_bucket_url, json=body, **kwargs) as resp:
                 if resp.status == 201:
                     print(f"bucket '{self.bucket_name}' created")
@@ -108,23 +162,35 @@ class StorageClient:
 
     async def post_file(self, form: FileData, **kwargs):
 
-        data = FormData()
-        data.add_field('objectName', str(form.objectName))
-        data.add_field('objectData', form.objectData)
-        data.add_field('objectSize', str(form.objectSize))
-        data.add_field('contentType', form.content_type)
-        data.add_field('contentEncoding', form.content_encoding)
-        if form.owner:
-            data.add_field('owner', form.owner)
-
-        async with aiohttp.ClientSession(headers=self.headers) as session:
-            async with await session.post(url=self.upload_file_url, data=data, **kwargs) as resp:
-                if resp.status == 201:
-                    return await resp.read()
-                await raise_exception_from_response(resp)
-
-    async def post_object(self, path: Union[Path, str], content: Union[str, bytes], content_type: str,
-                          owner: Union[str, None], **kwargs):
+        with opened_object_data(form.objectData) as object_data:
+            data = FormData()
+            data.add_field('objectName', str(form.objectName))
+            data.add_field('objectData', object_data, filename='objectData')
+            data.add_field('objectSize', str(form.objectSize))
+            data.add_field('contentType', form.content_type)
+            data.add_field('contentEncoding', form.content_encoding)
+            if form.owner:
+                data.add_field('owner', form.owner)
+
+            async with pooled_session(self.url_base, self.headers) as session:
+                async with await session.post(url=self.upload_file_url, data=data, **kwargs) as resp:
+                    if resp.status == 201:
+                        return await resp.read()
+                    await raise_exception_from_response(resp)
+
+    async def post_object(self, path: Union[Path, str], content: Union[str, ObjectData], content_type: str,
+                          owner: Union[str, None], binary: bool = False, size: int = None, **kwargs):
+        """
+        If 'binary' is set, or if 'content' is a path or an async iterator, the content is sent as is (no base64)
+        in a multipart body streamed from its source; 'size' is required for an async iterator.
+        """
+        if binary or not isinstance(content, (str, bytes)):
+            if isinstance(content, str):
+                content = str.encode(content)
+            form = FileData(objectName=path, objectData=content,
+                            objectSize=size if size is not None else object_size(content),
+                            content_type=content_type, content_encoding="", owner=owner)
+            return await self.post_file(form, **kwargs)
 
         if isinstance(content, str):
             content = str.encode(content)
@@ -142,7 +208,7 @@ class StorageClient:
             }
         params = {"owner": owner} if owner else {}
 
-        async with aiohttp.ClientSession(headers=self.headers) as session:
+        async with pooled_session(self.url_base, self.headers) as session:
             async with await session.post(url=self.object_url, json=body, params=params, **kwargs) as resp:
                 if resp.status == 201:
                     return await resp.read()
@@ -164,7 +230,7 @@ class StorageClient:
         if owner:
             params["owner"] = owner
 
-        async with aiohttp.ClientSession(headers=self.headers) as session:
+        async with pooled_session(self.url_base, self.headers) as session:
             async with await session.delete(url=self.objects_url, params=params, **kwargs) as resp:
                 if resp.status == 200:
                     return await resp.json()
@@ -176,7 +242,7 @@ class StorageClient:
         if owner:
             params["owner"] = owner
 
-        async with aiohttp.ClientSession(headers=self.headers) as session:
+        async with pooled_session(self.url_base, self.headers) as session:
             async with await session.delete(url=self.object_url, params=params, **kwargs) as resp:
                 if resp.status == 200:
                     return await resp.json()
@@ -189,7 +255,7 @@ class StorageClient:
         if owner:
             params["owner"] = owner
 
-        async with aiohttp.ClientSession(headers=self.headers) as session:
+        async with pooled_session(self.url_base, self.headers) as session:
             async with await session.get(url=self.list_files_url, params=params, **kwargs) as resp:
                 if resp.status == 200:
                     files = await resp.json()
@@ -203,13 +269,76 @@ class StorageClient:
         if owner:
             params["owner"] = owner
 
-        async with aiohttp.ClientSession(headers=self.headers) as session:
+        async with pooled_session(self.url_base, self.headers) as session:
             async with await session.get(url=url, params=params, **kwargs) as resp:
                 if resp.status == 200:
                     resp_bytes = await resp.read()
                     return base64.decodebytes(resp_bytes)
                 await raise_exception_from_response(resp)
 
+    async def get_bytes_if_modified(self, path: Union[Path, str], owner: Union[str, None], etag: Union[str, None],
+                                    **kwargs) -> Tuple[Union[bytes, None], Union[str, None]]:
+        """
+        Conditional 'get_bytes': returns (None, etag) if the object still matches 'etag', (content, new etag)
+        otherwise; the etag is None if the service does not provide one.
+        """
+        params = {'objectName': str(path)}
+        if owner:
+            params["owner"] = owner
+        headers = {**(kwargs.pop('headers', None) or {}), **({"If-None-Match": etag} if etag else {})}
+
+        async with pooled_session(self.url_base, self.headers) as session:
+            async with await session.get(url=self.object_url, params=params, headers=headers, **kwargs) as resp:
+                if resp.status == 304:
+                    return None, etag
+                if resp.status == 200:
+                    resp_bytes = await resp.read()
+                    return base64.decodebytes(resp_bytes), resp.headers.get("ETag", None)
+                await raise_exception_from_response(resp)
+
+    async def stream_bytes(self, path: Union[Path, str], owner: Union[str, None], chunk_size: int = 2**16,
+                           **kwargs) -> AsyncIterator[bytes]:
+        """
+        Same content as 'get_bytes', decoded and yielded as the response is received.
+        """
+        params = {'objectName': str(path)}
+        if owner:
+            params["owner"] = owner
+
+        async with pooled_session(self.url_base, self.headers) as session:
+            async with await session.get(url=self.object_url, params=params, **kwargs) as resp:
+                if resp.status != 200:
+                    await raise_exception_from_response(resp)
+                decoder = Base64StreamDecoder()
+                async for chunk in resp.content.iter_chunked(chunk_size):
+                    decoded = decoder.decode(chunk)
+                    if decoded:
+                        yield decoded
+                decoded = decoder.flush()
+                if decoded:
+                    yield decoded
+
+    async def download_to(self, path: Union[Path, str], owner: Union[str, None], target: Union[Path, str],
+                          **kwargs) -> int:
+        """
+        Writes the object in 'target' as it is received (through a temporary file moved once complete),
+        returns its size.
+        """
+        target = Path(target)
+        tmp_path = target.parent / f".{target.name}.{uuid.uuid4().hex}"
+        size = 0
+        try:
+            async with aiofiles.open(tmp_path, 'wb') as fp:
+                async for chunk in self.stream_bytes(path, owner, **kwargs):
+                    await fp.write(chunk)
+                    size += len(chunk)
+            os.replace(tmp_path, target)
+        except BaseException:
+            if tmp_path.exists():
+                os.remove(tmp_path)
+            raise
+        return size
+
     async def get_json(self, path: Union[Path, str], owner: Union[str, None], **kwargs):
 
         content = await self.get_bytes(path, owner, **kwargs)
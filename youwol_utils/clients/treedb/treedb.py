@@ -1,7 +1,7 @@
 from typing import Dict
-import aiohttp
 from dataclasses import dataclass, field
 
+from youwol_utils.clients.http_sessions import pooled_session, coalesced_get
 from youwol_utils.clients.utils import raise_exception_from_response
 
 
@@ -11,12 +11,11 @@ class TreeDbClient:
     url_base: str
 
     headers: Dict[str, str] = field(default_factory=lambda: {})
-    connector = aiohttp.TCPConnector(verify_ssl=False)
 
     async def get_drives(self, group_id: str, **kwargs):
 
         url = f"{self.url_base}/groups/{group_id}/drives"
-        async with aiohttp.ClientSession(headers=self.headers) as session:
+        async with pooled_session(self.url_base, self.headers) as session:
             async with await session.get(url=url, **kwargs) as resp:
                 if resp.status == 200:
                     drives = await resp.json()
@@ -27,7 +26,7 @@ class TreeDbClient:
     async def get_drive(self, drive_id: str, **kwargs):
 
         url = f"{self.url_base}/drives/{drive_id}"
-        async with aiohttp.ClientSession(headers=self.headers) as session:
+        async with pooled_session(self.url_base, self.headers) as session:
             async with await session.get(url=url, **kwargs) as resp:
                 if resp.status == 200:
                     drives = await resp.json()
@@ -38,7 +37,7 @@ class TreeDbClient:
     async def create_drive(self, group_id: str, body, **kwargs):
 
         url = f"{self.url_base}/groups/{group_id}/drives"
-        async with aiohttp.ClientSession(headers=self.headers) as session:
+        async with pooled_session(self.url_base, self.headers) as session:
             async with await session.put(url=url, json=body, **kwargs) as resp:
                 if resp.status == 200:
                     drives = await resp.json()
@@ -49,7 +48,7 @@ class TreeDbClient:
     async def update_drive(self, drive_id: str, body, **kwargs):
 
         url = f"{self.url_base}/drives/{drive_id}"
-        async with aiohttp.ClientSession(headers=self.headers) as session:
+        async with pooled_session(self.url_base, self.headers) as session:
             async with await session.post(url=url, json=body, **kwargs) as resp:
                 if resp.status == 200:
                     drives = await resp.json()
@@ -60,7 +59,7 @@ class TreeDbClient:
     async def delete_drive(self, drive_id: str, **kwargs):
 
         url = f"{self.url_base}/drives/{drive_id}"
-        async with aiohttp.ClientSession(headers=self.headers) as session:
+        async with pooled_session(self.url_base, self.headers) as session:
             async with await session.delete(url=url, **kwargs) as resp:
                 if resp.status == 200:
                     resp = await resp.json()
@@ -71,7 +70,7 @@ class TreeDbClient:
     async def create_folder(self, parent_folder_id: str, body, **kwargs):
 
         url = f"{self.url_base}/folders/{parent_folder_id}"
-        async with aiohttp.ClientSession(headers=self.headers) as session:
+        async with pooled_session(self.url_base, self.headers) as session:
             async with await session.put(url=url, json=body, **kwargs) as resp:
                 if resp.status == 200:
                     folder = await resp.json()
@@ -82,7 +81,7 @@ class TreeDbClient:
     async def update_folder(self, folder_id: str, body, **kwargs):
 
         url = f"{self.url_base}/folders/{folder_id}"
-        async with aiohttp.ClientSession(headers=self.headers) as session:
+        async with pooled_session(self.url_base, self.headers) as session:
             async with await session.post(url=url, json=body, **kwargs) as resp:
                 if resp.status == 200:
                     folder = await resp.json()
@@ -93,7 +92,7 @@ class TreeDbClient:
     async def move(self, body, **kwargs):
 
         url = f"{self.url_base}/move"
-        async with aiohttp.ClientSession(headers=self.headers) as session:
+        async with pooled_session(self.url_base, self.headers) as session:
             async with await session.post(url=url, json=body, **kwargs) as resp:
                 if resp.status == 200:
                     folder = await resp.json()
@@ -104,7 +103,7 @@ class TreeDbClient:
     async def remove_folder(self, folder_id: str, **kwargs):
 
         url = f"{self.url_base}/folders/{folder_id}"
-        async with aiohttp.ClientSession(headers=self.headers) as session:
+        async with pooled_session(self.url_base, self.headers) as session:
             async with await session.delete(url=url, **kwargs) as resp:
                 if resp.status == 200:
                     resp = await resp.json()
@@ -115,7 +114,7 @@ class TreeDbClient:
     async def remove_item(self, item_id: str, **kwargs):
 
         url = f"{self.url_base}/items/{item_id}"
-        async with aiohttp.ClientSession(headers=self.headers) as session:
+        async with pooled_session(self.url_base, self.headers) as session:
             async with await session.delete(url=url, **kwargs) as resp:
                 if resp.status == 200:
                     resp = await resp.json()
@@ -126,13 +125,17 @@ class TreeDbClient:
     async def get_item(self, item_id: str, **kwargs):
 
         url = f"{self.url_base}/items/{item_id}"
-        async with aiohttp.ClientSession(headers=self.headers) as session:
-            async with await session.get(url=url, **kwargs) as resp:
-                if resp.status == 200:
-                    items = await resp.json()
-                    return items
 
-                await raise_exception_from_response(resp, **kwargs)
+        async def fetch():
+            async with pooled_session(self.url_base, self.headers) as session:
+                async with await session.get(url=url, **kwargs) as resp:
+                    if resp.status == 200:
+                        items = await resp.json()
+                        return items
+
+                    await raise_exception_from_response(resp, **kwargs)
+
+        return await coalesced_get(url, {**self.headers, **(kwargs.get('headers') or {})}, kwargs.get('params'), fetch)
 
     async def get_entity(self, entity_id: str, include_drives: bool = True, include_folders: bool = True,
                          include_items: bool = True, **kwargs):
@@ -141,7 +144,7 @@ class TreeDbClient:
         params = {"include-drives": int(include_drives),
                   "include-folders": int(include_folders),
                   "include-items": int(include_items)}
-        async with aiohttp.ClientSession(headers=self.headers) as session:
+        async with pooled_session(self.url_base, self.headers) as session:
             async with await session.get(url=url, params=params, **kwargs) as resp:
                 if resp.status == 200:
                     items = await resp.json()
@@ -152,7 +155,7 @@ class TreeDbClient:
     async def get_items_from_related_id(self, related_id: str, **kwargs):
 
         url = f"{self.url_base}/items/from-related/{related_id}"
-        async with aiohttp.ClientSession(headers=self.headers) as session:
+        async with pooled_session(self.url_base, self.headers) as session:
             async with await session.get(url=url, **kwargs) as resp:
                 if resp.status == 200:
                     items = await resp.json()
@@ -163,7 +166,7 @@ class TreeDbClient:
     async def update_item(self, item_id: str, body, **kwargs):
 
         url = f"{self.url_base}/items/{item_id}"
-        async with aiohttp.ClientSession(headers=self.headers) as session:
+        async with pooled_session(self.url_base, self.headers) as session:
             async with await session.post(url=url, json=body, **kwargs) as resp:
                 if resp.status == 200:
                     items = await resp.json()
@@ -174,7 +177,7 @@ class TreeDbClient:
     async def get_folder(self, folder_id: str, **kwargs):
 
         url = f"{self.url_base}/folders/{folder_id}"
-        async with aiohttp.ClientSession(headers=self.headers) as session:
+        async with pooled_session(self.url_base, self.headers) as session:
             async with await session.get(url=url, **kwargs) as resp:
                 if resp.status == 200:
                     items = await resp.json()
@@ -185,7 +188,7 @@ class TreeDbClient:
     async def get_children(self, folder_id: str, **kwargs):
 
         url = f"{self.url_base}/folders/{folder_id}/children"
-        async with aiohttp.ClientSession(headers=self.headers) as session:
+        async with pooled_session(self.url_base, self.headers) as session:
             async with await session.get(url=url, **kwargs) as resp:
                 if resp.status == 200:
                     items = await resp.json()
@@ -196,7 +199,7 @@ class TreeDbClient:
     async def get_deleted(self, drive_id: str, **kwargs):
 
         url = f"{self.url_base}/drives/{drive_id}/deleted"
-        async with aiohttp.ClientSession(headers=self.headers) as session:
+        async with pooled_session(self.url_base, self.headers) as session:
             async with await session.get(url=url, **kwargs) as resp:
                 if resp.status == 200:
                     items = await resp.json()
@@ -207,7 +210,7 @@ class TreeDbClient:
     async def purge_drive(self, drive_id: str, **kwargs):
 
         url = f"{self.url_base}/drives/{drive_id}/purge"
-        async with aiohttp.ClientSession(headers=self.headers) as session:
+        async with pooled_session(self.url_base, self.headers) as session:
             async with await session.delete(url=url, **kwargs) as resp:
                 if resp.status == 200:
                     items = await resp.json()
@@ -218,7 +221,7 @@ class TreeDbClient:
     async def create_item(self, folder_id: str, body, **kwargs):
 
         url = f"{self.url_base}/folders/{folder_id}/items"
-        async with aiohttp.ClientSession(headers=self.headers) as session:
+        async with pooled_session(self.url_base, self.headers) as session:
             async with await session.put(url=url, json=body, **kwargs) as resp:
                 if resp.status == 200:
                     folder = await resp.json()
@@ -229,7 +232,7 @@ class TreeDbClient:
     async def get_records(self, body, **kwargs):
 
         url = f"{self.url_base}/records"
-        async with aiohttp.ClientSession(headers=self.headers) as session:
+        async with pooled_session(self.url_base, self.headers) as session:
             async with await session.post(url=url, json=body, **kwargs) as resp:
                 if resp.status == 200:
                     folder = await resp.json()
@@ -5,12 +5,14 @@ from pydantic import BaseModel
 
 from youwol_utils.clients.docdb import DocDbClient, LocalDocDbClient
 from youwol_utils.clients.docdb.local_docdb_in_memory import LocalDocDbInMemoryClient
-from youwol_utils.clients.storage import StorageClient, LocalStorageClient
-from youwol_utils.clients.cache import CacheClient, LocalCacheClient
-
-DocDb = Union[DocDbClient, LocalDocDbClient, LocalDocDbInMemoryClient]
-Storage = Union[StorageClient, LocalStorageClient]
-Cache = Union[CacheClient, LocalCacheClient]
+from youwol_utils.clients.docdb.local_docdb_sqlite import LocalDocDbSqliteClient
+from youwol_utils.clients.docdb.cached_docdb import CachedDocDbClient
+from youwol_utils.clients.storage import StorageClient, LocalStorageClient, CachedStorageClient
+from youwol_utils.clients.cache import CacheClient, LocalCacheClient, TwoTierCacheClient
+
+DocDb = Union[DocDbClient, LocalDocDbClient, LocalDocDbInMemoryClient, LocalDocDbSqliteClient, CachedDocDbClient]
+Storage = Union[StorageClient, LocalStorageClient, CachedStorageClient]
+Cache = Union[CacheClient, LocalCacheClient, TwoTierCacheClient]
 
 
 class Group(BaseModel):
@@ -1,4 +1,6 @@
-from typing import Mapping, Union, NamedTuple, List
+import copy
+import functools
+from typing import Mapping, Union, NamedTuple, List, Iterable, Callable, Any, Dict, Tuple
 
 from aiohttp import ClientResponse
 import base64
@@ -12,6 +14,7 @@ class GroupInfo(NamedTuple):
     scope: str
 
 
+@functools.lru_cache(maxsize=10000)
 def to_group_id(group_path: Union[str, None]) -> str:
     if group_path == 'private':
         return 'private'
@@ -23,6 +26,7 @@ def group_info(group_id: str):
     return GroupInfo(id=group_id, owner=to_group_owner(group_id), scope=to_group_scope(group_id))
 
 
+@functools.lru_cache(maxsize=10000)
 def to_group_scope(group_id: str) -> str:
     if "private" in group_id:
         return 'private'
@@ -30,6 +34,7 @@ def to_group_scope(group_id: str) -> str:
     return base64.urlsafe_b64decode(b).decode()
 
 
+@functools.lru_cache(maxsize=10000)
 def to_group_owner(group_id: str) -> Union[str, None]:
     if 'private' in group_id:
         return None
@@ -54,16 +59,108 @@ def is_child_group(child_group_id, parent_group_id):
 
 
 def ancestors_group_id(group_id):
+    return list(_ancestors_group_id(group_id))
+
+
+@functools.lru_cache(maxsize=10000)
+def _ancestors_group_id(group_id) -> Tuple[str, ...]:
 
     scope = to_group_scope(group_id)
     if scope == "private":
-        return []
+        return ()
 
-    items = [scope for scope in scope.split('/') if scope != ""]
-    paths = ['/'.join([""]+items[0:i+1]) for i, _ in enumerate(items)]
+    items = scope_segments(scope)
+    paths = ['/'.join([""]+list(items[0:i+1])) for i, _ in enumerate(items)]
     ids = [to_group_id(p) for p in paths[0:-1]]
     ids.reverse()
-    return ids
+    return tuple(ids)
+
+
+@functools.lru_cache(maxsize=10000)
+def scope_segments(scope: str) -> Tuple[str, ...]:
+    return tuple(segment for segment in scope.split('/') if segment != "")
+
+
+class GroupScopeIndex:
+    """
+    Index of a set of groups (typically the ones of a user) as a trie of their scopes keyed by path segments,
+    private groups are indexed by id. Queries walk the trie once, whatever the number of indexed groups:
+        *  'is_accessible': the group is one of the indexed groups or one of their ancestors
+        *  'is_within': the group is one of the indexed groups or one of their descendants
+
+    A frozen index (see 'freeze') can not be extended anymore, e.g. when it is shared between requests.
+    """
+
+    def __init__(self, group_ids: Iterable[str] = ()):
+        # segment => child node, the key 'None' flags the end of an indexed scope
+        self.root: Dict[Union[str, None], Any] = {}
+        self.private_ids = set()
+        self.frozen = False
+        for group_id in group_ids:
+            self.add(group_id)
+
+    def freeze(self) -> 'GroupScopeIndex':
+        self.frozen = True
+        return self
+
+    def copy(self) -> 'GroupScopeIndex':
+
+        index = GroupScopeIndex()
+        index.root = copy.deepcopy(self.root)
+        index.private_ids = set(self.private_ids)
+        return index
+
+    def add(self, group_id: str):
+
+        if self.frozen:
+            raise RuntimeError("GroupScopeIndex is frozen, use 'copy()' to extend it")
+        scope = to_group_scope(group_id)
+        if scope == 'private':
+            self.private_ids.add(group_id)
+            return
+        self.add_scope(scope)
+
+    def add_scope(self, scope: str):
+
+        if self.frozen:
+            raise RuntimeError("GroupScopeIndex is frozen, use 'copy()' to extend it")
+        node = self.root
+        for segment in scope_segments(scope):
+            node = node.setdefault(segment, {})
+        node[None] = True
+
+    def is_accessible(self, group_id: str) -> bool:
+
+        if to_group_scope(group_id) == 'private':
+            return group_id in self.private_ids
+        return self.is_scope_accessible(to_group_scope(group_id))
+
+    def is_scope_accessible(self, scope: str) -> bool:
+
+        node = self.root
+        for segment in scope_segments(scope):
+            node = node.get(segment, None)
+            if node is None:
+                return False
+        return len(node) > 0
+
+    def is_within(self, group_id: str) -> bool:
+
+        scope = to_group_scope(group_id)
+        if scope == 'private':
+            return group_id in self.private_ids
+
+        node = self.root
+        for segment in scope_segments(scope):
+            if None in node:
+                return True
+            node = node.get(segment, None)
+            if node is None:
+                return False
+        return None in node
+
+    def filter_accessible(self, items: Iterable[Any], group_id: Callable[[Any], str] = lambda item: item) -> List[Any]:
+        return [item for item in items if self.is_accessible(group_id(item))]
 
 
 class YouWolException(HTTPException):
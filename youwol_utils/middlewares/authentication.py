@@ -1,35 +1,50 @@
 from fastapi import HTTPException
-from starlette.middleware.base import BaseHTTPMiddleware, RequestResponseEndpoint, DispatchFunction
 from starlette.requests import Request
 from starlette.responses import Response
-from starlette.types import ASGIApp
+from starlette.types import ASGIApp, Scope, Receive, Send
 
+from youwol_utils.clients.auth.jwks import JwksValidator
+from youwol_utils.clients.cache.fetcher import CacheFetcher
 
-class Middleware(BaseHTTPMiddleware):
+
+class Middleware:
+    """
+    Pure ASGI middleware: the request is forwarded untouched to 'app' (no intermediate tasks or streams as with
+    BaseHTTPMiddleware), 'user_info' is available in 'request.state' of the endpoints (the user's groups are
+    computed from it when needed, see 'youwol_utils.utils.user_groups').
+
+    If 'jwks_validator' is provided, tokens are validated offline and 'user_info' is built from their claims:
+    neither the identity provider nor the cache is involved in the request.
+    """
 
     def __init__(self, app: ASGIApp, auth_client, cache_client,
                  unprotected_paths,
-                 dispatch: DispatchFunction = None,
+                 jwks_validator: JwksValidator = None,
                  **_) -> None:
+        self.app = app
         self.auth_client = auth_client
         self.cache_client = cache_client
+        self.user_info_fetcher = CacheFetcher(cache=cache_client, ex=3600)
         self.unprotected_paths = unprotected_paths
-        super().__init__(app, dispatch)
+        self.jwks_validator = jwks_validator
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
 
-    async def dispatch(
-        self, request: Request, call_next: RequestResponseEndpoint
-            ) -> Response:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
 
+        request = Request(scope)
         if self.unprotected_paths(request.url):
-            response = await call_next(request)
-        else:
-            bearer_token = request.headers.get('Authorization')
-            if await self.authenticate(bearer_token, request):
-                response = await call_next(request)
-            else:
-                response = Response(content="Unauthorized", status_code=403)
+            await self.app(scope, receive, send)
+            return
 
-        return response
+        bearer_token = request.headers.get('Authorization')
+        if await self.authenticate(bearer_token, request):
+            await self.app(scope, receive, send)
+        else:
+            response = Response(content="Unauthorized", status_code=403)
+            await response(scope, receive, send)
 
     async def authenticate(self, bearer_token: str, request: Request) -> bool:
         if bearer_token is None:
@@ -38,15 +53,21 @@ class Middleware(BaseHTTPMiddleware):
         # Remove the Bearer prefix
         bearer_token = bearer_token[7:]
 
-        user_info = await self.cache_client.get(name=bearer_token)
-        ret = user_info is not None
-        if not user_info:
-            try:
-                user_info = await self.auth_client.get_userinfo(bearer_token=bearer_token)
-                ret = await self.cache_client.set(name=bearer_token, value=user_info, ex=3600)
-            except HTTPException:
-                return False
+        try:
+            user_info = await self.get_user_info(bearer_token)
+        except HTTPException:
+            return False
 
         request.state.user_info = user_info
 
-        return ret
+        return True
+
+    async def get_user_info(self, bearer_token: str):
+
+        if self.jwks_validator:
+            return await self.jwks_validator.get_userinfo(bearer_token=bearer_token)
+
+        return await self.user_info_fetcher.get(
+            name=bearer_token,
+            fetch=lambda: self.auth_client.get_userinfo(bearer_token=bearer_token)
+            )
@@ -1,45 +1,50 @@
 import aiohttp
-from starlette.middleware.base import BaseHTTPMiddleware, RequestResponseEndpoint, DispatchFunction
+from fastapi import HTTPException
 from starlette.requests import Request
 from starlette.responses import Response
-from starlette.types import ASGIApp
+from starlette.types import ASGIApp, Scope, Receive, Send
 
+from youwol_utils.clients.cache.fetcher import CacheFetcher
+from youwol_utils.clients.cache.local_cache import LocalCacheClient
 
-class AuthLocalMiddleware(BaseHTTPMiddleware):
 
-    cache = {}
+class AuthLocalMiddleware:
+
+    user_info_fetcher = CacheFetcher(cache=LocalCacheClient(), ex=3600)
     url_base_auth = "http://localhost:2000/api/authorization"
 
     def __init__(self, app: ASGIApp,
-                 dispatch: DispatchFunction = None,
                  **_) -> None:
-        super().__init__(app, dispatch)
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
 
-    async def dispatch(
-            self, request: Request, call_next: RequestResponseEndpoint
-            ) -> Response:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
 
+        request = Request(scope)
         user_name = request.headers.get('Authorization')
         if await self.authenticate(user_name, request):
-            response = await call_next(request)
+            await self.app(scope, receive, send)
         else:
             response = Response(content="Unauthorized", status_code=403)
-        return response
+            await response(scope, receive, send)
 
     async def authenticate(self, auth_token: str, request: Request) -> bool:
 
-        user_info = self.cache.get(auth_token, None)
-        if user_info:
-            request.state.user_info = user_info
-            return True
         excluded = ['content-length']
         headers = {k: v for k, v in request.headers.items() if k not in excluded}
 
-        async with aiohttp.ClientSession() as session:
-            async with await session.get(url=f"{self.url_base_auth}/user-info", headers=headers) as resp:
-                if resp.status == 200:
-                    user_info = await resp.json()
-                    request.state.user_info = user_info
-                    self.cache[auth_token] = user_info
-                    return True
-                return False
+        async def fetch():
+            async with aiohttp.ClientSession() as session:
+                async with await session.get(url=f"{self.url_base_auth}/user-info", headers=headers) as resp:
+                    if resp.status == 200:
+                        return await resp.json()
+                    raise HTTPException(status_code=resp.status, detail="Can not retrieve user info")
+
+        try:
+            request.state.user_info = await self.user_info_fetcher.get(name=str(auth_token), fetch=fetch)
+        except HTTPException:
+            return False
+        return True
@@ -1,15 +1,19 @@
 import asyncio
+import functools
 import itertools
 import json
 import os
 from pathlib import Path
-from typing import Union, List, cast, Mapping
+from typing import Union, List, cast, Mapping, FrozenSet, Tuple, Iterable
+
+from dataclasses import dataclass
 
 import aiohttp
 from fastapi import HTTPException
 from starlette.requests import Request
 
-from youwol_utils.clients.utils import raise_exception_from_response, to_group_id, to_group_scope
+from youwol_utils.clients.utils import raise_exception_from_response, to_group_id, to_group_scope, GroupScopeIndex
+from youwol_utils.clients.docdb.models import QueryBody
 from youwol_utils.clients.types import DocDb
 
 flatten = itertools.chain.from_iterable
@@ -27,20 +31,59 @@ def private_group_id(user):
     return f"private_{user['sub']}"
 
 
-def is_authorized_write(request: Request, group_id):
-    user = user_info(request)
-    group_ids = get_user_group_ids(user)
-    if group_id not in group_ids:
-        return False
+write_permissions = {
+    '/youwol-users': ['greinisch@youwol.com']
+    }
+
+
+@dataclass(frozen=True)
+class UserGroups:
+    """
+    Groups of a user, computed once per user by 'get_user_groups':
+        *  group_ids: private group & groups the user belongs to, including their ancestors
+        *  leaf_group_ids: private group & groups the user explicitly belongs to
+        *  writable_group_ids: the subset of 'group_ids' the user can write in (see 'write_permissions')
+        *  scope_index: index of 'leaf_group_ids', e.g. to filter resources by accessible group in one pass; it is
+        shared by the requests of the user and thus frozen, 'scope_index.copy()' returns an index that can be extended
+    """
+    group_ids: FrozenSet[str]
+    leaf_group_ids: FrozenSet[str]
+    writable_group_ids: FrozenSet[str]
+    scope_index: GroupScopeIndex
+
+
+@functools.lru_cache(maxsize=10000)
+def _user_groups(sub: str, preferred_username: str, memberof: Tuple[str, ...]) -> UserGroups:
+
+    user = {"sub": sub, "preferred_username": preferred_username, "memberof": list(memberof)}
+    group_ids = frozenset(get_user_group_ids(user))
+    writable = [g for g in group_ids
+                if to_group_scope(g) not in write_permissions
+                or preferred_username in write_permissions[to_group_scope(g)]]
+    leaf_group_ids = frozenset(get_leaf_group_ids(user))
+    return UserGroups(group_ids=group_ids,
+                      leaf_group_ids=leaf_group_ids,
+                      writable_group_ids=frozenset(writable),
+                      scope_index=GroupScopeIndex(leaf_group_ids).freeze())
+
+
+def get_user_groups(user) -> UserGroups:
+    return _user_groups(user.get('sub'), user.get('preferred_username'), tuple(user.get("memberof", [])))
 
-    permissions = {
-        '/youwol-users': ['greinisch@youwol.com']
-        }
-    scope = to_group_scope(group_id)
-    if scope in permissions:
-        return user['preferred_username'] in permissions[scope]
 
-    return True
+def user_groups(request: Request) -> UserGroups:
+    """
+    Groups of the authenticated user, computed from 'user_info' at the first call and kept in the request's state.
+    """
+    groups = getattr(request.state, 'user_groups', None)
+    if not groups:
+        groups = get_user_groups(user_info(request))
+        request.state.user_groups = groups
+    return groups
+
+
+def is_authorized_write(request: Request, group_id):
+    return group_id in user_groups(request).writable_group_ids
 
 
 def get_all_individual_groups(groups: List[str]) -> List[Union[str, None]]:
@@ -71,9 +114,7 @@ def get_leaf_group_ids(user) -> List[Union[str, None]]:
 
 def ensure_group_permission(request: Request, group_id: str):
 
-    user = user_info(request)
-    allowed_groups = get_user_group_ids(user)
-    if group_id not in allowed_groups:
+    if group_id not in user_groups(request).group_ids:
         raise HTTPException(status_code=401, detail=f"User can not get/post resource")
 
 
@@ -167,18 +208,54 @@ def chunks(lst, n):
 
 async def get_group(primary_key: str, primary_value: Union[str, float, int, bool], groups: List[str], doc_db: DocDb,
                     headers: Mapping[str, str]):
-
-    requests = [doc_db.query(query_body=f"{primary_key}={primary_value}#1", owner=group, headers=headers)
-                for group in groups]
-    responses = await asyncio.gather(*requests)
-    group = next((g for i, g in enumerate(groups) if responses[i]["documents"]), None)
-    return group
-
-
-def check_permission_or_raise(target_group: Union[str, None], allowed_groups: List[Union[None, str]]):
-
+    """
+    Returns the first of 'groups' owning a document with 'primary_key'='primary_value', None if none does.
+
+    If 'doc_db' supports multi-owner queries ('query_owners'), a single query is issued. Otherwise, one query per
+    group is issued and the remaining ones are cancelled as soon as the result is known.
+    """
+    if not groups:
+        return None
+
+    query_body = QueryBody.parse(f"{primary_key}={primary_value}#1")
+    if hasattr(doc_db, 'query_owners'):
+        query_body.max_results = len(groups)
+        response = await doc_db.query_owners(query_body=query_body, owners=groups, headers=headers)
+        owners = {doc["owner"] for doc in response["documents"]}
+        return next((g for g in groups if g in owners), None)
+
+    tasks = [asyncio.ensure_future(doc_db.query(query_body=query_body, owner=group, headers=headers))
+             for group in groups]
+    try:
+        for group, task in zip(groups, tasks):
+            response = await task
+            if response["documents"]:
+                return group
+        return None
+    finally:
+        for task in tasks:
+            if not task.done():
+                task.cancel()
+            elif not task.cancelled():
+                # retrieved to not report errors of queries whose results are not needed
+                task.exception()
+
+
+def check_permission_or_raise(target_group: Union[str, None],
+                              allowed_groups: Union[Iterable[Union[None, str]], GroupScopeIndex]):
+    """
+    'target_group' is a scope that should be included in one of 'allowed_groups' (e.g. a parent scope).
+    If 'allowed_groups' is a GroupScopeIndex, the check is made on path segments.
+    """
     if not target_group:
         return
+    if isinstance(allowed_groups, GroupScopeIndex):
+        if not allowed_groups.is_scope_accessible(target_group):
+            raise HTTPException(status_code=401,
+                                detail=f"scope '{target_group}' not included in user groups")
+        return
+    if isinstance(allowed_groups, (set, frozenset)) and target_group in allowed_groups:
+        return
     compatible_groups = [g for g in allowed_groups if target_group in g]
     if len(compatible_groups) == 0:
         raise HTTPException(status_code=401,